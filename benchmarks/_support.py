@@ -0,0 +1,79 @@
+"""
+Shared helpers for the benchmarks: a client that doesn't talk to Discord, and
+signed interaction payloads for it.
+"""
+import json
+import time
+
+from nacl.signing import SigningKey
+
+from bparrot import BotClient, SlashOption
+
+SIGNING_KEY = SigningKey(b"\x01" * 32)
+PUBLIC_KEY = SIGNING_KEY.verify_key.encode().hex()
+
+
+class BenchClient(BotClient):
+    """
+    A BotClient that skips login and command registration on startup.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__("bench-token", public_key=PUBLIC_KEY, **kwargs)
+
+    async def _pre_run(self):
+        pass
+
+
+def make_client(**kwargs) -> BenchClient:
+    client = BenchClient(**kwargs)
+
+    @client.slash_command(
+        name="echo",
+        description="Echo a message",
+        options=[SlashOption("text", "The text to echo")],
+    )
+    async def echo(inter, **kwargs):
+        return inter.create_response(kwargs.get("text", "Hello World!"))
+
+    return client
+
+
+def slash_payload(name: str = "echo", interaction_id: int = 1, **options) -> dict:
+    return {
+        "id": str(interaction_id),
+        "application_id": "1",
+        "type": 2,
+        "token": "interaction-token",
+        "version": 1,
+        "guild_id": "2",
+        "channel_id": "3",
+        "member": {"user": {"id": "4", "username": "bench", "discriminator": "0"}},
+        "data": {
+            "id": "5",
+            "name": name,
+            "type": 1,
+            "options": [
+                {"name": key, "type": 3, "value": value}
+                for key, value in options.items()
+            ],
+        },
+    }
+
+
+def sign(body: str, timestamp: str = None) -> dict:
+    """
+    Return the signature headers Discord would send along with `body`.
+    """
+    timestamp = timestamp or str(int(time.time()))
+    signature = SIGNING_KEY.sign(f"{timestamp}{body}".encode()).signature
+    return {
+        "Content-Type": "application/json",
+        "X-Signature-Ed25519": signature.hex(),
+        "X-Signature-Timestamp": timestamp,
+    }
+
+
+def signed_request(payload: dict):
+    body = json.dumps(payload)
+    return body, sign(body)
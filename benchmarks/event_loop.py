@@ -0,0 +1,82 @@
+"""
+Compare the default asyncio event loop with uvloop on the interaction path:
+signed slash command requests sent over HTTP to a running client.
+
+Usage (from the repository root):
+    PYTHONPATH=. python benchmarks/event_loop.py [--requests N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+
+from _support import make_client, signed_request, slash_payload
+
+
+async def bench(requests: int, concurrency: int):
+    client = make_client()
+    payloads = [
+        signed_request(slash_payload(interaction_id=i, text="hi"))
+        for i in range(requests)
+    ]
+    latencies = []
+
+    async with client:
+        await client.start(host="127.0.0.1", port=0)
+        port = client._runner.addresses[0][1]
+        url = f"http://127.0.0.1:{port}/"
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async with aiohttp.ClientSession() as session:
+
+            async def send(body, headers):
+                async with semaphore:
+                    start = time.perf_counter()
+                    async with session.post(url, data=body, headers=headers) as resp:
+                        await resp.read()
+                        assert resp.status == 200, resp.status
+                    latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(send(body, headers) for body, headers in payloads))
+            elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "req/s": requests / elapsed,
+        "p50 ms": statistics.median(latencies) * 1000,
+        "p99 ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    loops = {"asyncio": asyncio.new_event_loop}
+    try:
+        import uvloop
+
+        loops["uvloop"] = uvloop.new_event_loop
+    except ImportError:
+        print("uvloop is not installed, only benchmarking the default loop.")
+
+    for name, factory in loops.items():
+        loop = factory()
+        try:
+            result = loop.run_until_complete(bench(args.requests, args.concurrency))
+        finally:
+            loop.close()
+        print(
+            f"{name:8} "
+            + "  ".join(f"{key} {value:8.1f}" for key, value in result.items())
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measure the cold start cost of `import bparrot` and of constructing a Client,
+by parsing the output of `python -X importtime`.
+
+Usage: python benchmarks/import_time.py [--runs N] [--top N]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = {
+    "import bparrot": "import bparrot",
+    "Client(...)": (
+        "import bparrot; bparrot.BotClient('token', public_key='00' * 32)"
+    ),
+}
+
+
+def parse_importtime(stderr: str):
+    """
+    Parse `-X importtime` output into a list of (self_us, cumulative_us, name).
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, _, fields = line.partition(":")
+        self_us, cumulative_us, name = fields.split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def measure(code: str):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for label, code in SCENARIOS.items():
+        totals = []
+        rows = []
+        for _ in range(args.runs):
+            rows = measure(code)
+            totals.append(sum(row[0] for row in rows))
+
+        print(f"{label}")
+        print(
+            f"  total import time: median {statistics.median(totals) / 1000:.1f} ms,"
+            f" min {min(totals) / 1000:.1f} ms over {args.runs} runs"
+        )
+        print(f"  modules imported: {len(rows)}")
+
+        print(f"  top {args.top} by cumulative time (last run):")
+        top_level = [row for row in rows if not row[2].startswith("  ")]
+        for self_us, cumulative_us, name in sorted(top_level, key=lambda r: -r[1])[
+            : args.top
+        ]:
+            print(f"    {cumulative_us / 1000:8.1f} ms  {name.strip()}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
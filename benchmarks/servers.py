@@ -0,0 +1,146 @@
+"""
+Compare serving interactions with the client's aiohttp server and with ASGI
+servers running `Client.asgi_app()`, using the same signed slash command
+payloads. Each server runs in its own process, so it doesn't share an event
+loop with the load generator.
+
+Usage (from the repository root):
+    PYTHONPATH=. python benchmarks/servers.py [--requests N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+from _support import make_client, signed_request, slash_payload
+
+
+def serve(server: str, port: int):
+    client = make_client()
+
+    if server == "aiohttp":
+        from aiohttp import web
+
+        web.run_app(client.run_factory(), host="127.0.0.1", port=port, print=None)
+        return
+
+    import uvicorn
+
+    http = server.partition("-")[2] or "auto"
+    uvicorn.run(
+        client.asgi_app(),
+        host="127.0.0.1",
+        port=port,
+        http=http,
+        lifespan="on",
+        log_level="warning",
+        access_log=False,
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(session, url: str, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with session.get(url):
+                return
+        except aiohttp.ClientConnectionError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def bench(url: str, requests: int, concurrency: int):
+    payloads = [
+        signed_request(slash_payload(interaction_id=i, text="hi"))
+        for i in range(requests)
+    ]
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession() as session:
+        await wait_for_server(session, url)
+
+        async def send(body, headers):
+            async with semaphore:
+                start = time.perf_counter()
+                async with session.post(url, data=body, headers=headers) as resp:
+                    await resp.read()
+                    assert resp.status == 200, resp.status
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(body, headers) for body, headers in payloads))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "req/s": requests / elapsed,
+        "p50 ms": statistics.median(latencies) * 1000,
+        "p99 ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def available_servers():
+    servers = ["aiohttp"]
+    try:
+        import uvicorn  # noqa: F401
+    except ImportError:
+        print("uvicorn is not installed, only benchmarking aiohttp.")
+        return servers
+
+    servers.append("uvicorn-h11")
+    try:
+        import httptools  # noqa: F401
+
+        servers.append("uvicorn-httptools")
+    except ImportError:
+        pass
+    return servers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--serve", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve, args.port)
+
+    for server in available_servers():
+        port = free_port()
+        proc = subprocess.Popen(
+            [sys.executable, __file__, "--serve", server, "--port", str(port)],
+            env=os.environ,
+        )
+        try:
+            result = asyncio.run(
+                bench(f"http://127.0.0.1:{port}/", args.requests, args.concurrency)
+            )
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(
+            f"{server:18} "
+            + "  ".join(f"{key} {value:8.1f}" for key, value in result.items())
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Measure peak memory while uploading many attachments concurrently as
+interaction followups, streamed from disk versus read into memory first.
+
+Followups are sent to a local server that reads and discards the request
+bodies.
+
+Usage (from the repository root):
+    PYTHONPATH=. python benchmarks/upload_memory.py [--files N] [--size-mb N]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+from aiohttp import web
+
+import bparrot.http
+from bparrot.files import File
+from bparrot.http import HTTPClient
+
+
+async def sink(request):
+    received = 0
+    async for chunk in request.content.iter_chunked(64 * 1024):
+        received += len(chunk)
+    return web.json_response({"received": received})
+
+
+async def upload(paths, buffered: bool):
+    app = web.Application(client_max_size=0)
+    app.router.add_post("/webhooks/{application_id}/{token}", sink)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    bparrot.http.API_ENDPOINT = f"http://127.0.0.1:{port}"
+    http = HTTPClient(token="bench-token")
+    http.application_id = 1
+
+    def make_file(path):
+        if buffered:
+            with open(path, "rb") as f:
+                return File(io.BytesIO(f.read()), os.path.basename(path))
+        return File(path)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(
+                http.send_interaction_followup(
+                    "token", {"content": "upload"}, files=[make_file(path)]
+                )
+                for path in paths
+            )
+        )
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        await http.close()
+        await runner.cleanup()
+
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--size-mb", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(tmp, f"file{i}.bin")
+            with open(path, "wb") as f:
+                f.write(os.urandom(args.size_mb * 1024 * 1024))
+            paths.append(path)
+
+        total_mb = args.files * args.size_mb
+        print(f"Uploading {args.files} x {args.size_mb} MiB ({total_mb} MiB)")
+        for label, buffered in (("streamed", False), ("buffered", True)):
+            elapsed, peak = asyncio.run(upload(paths, buffered))
+            print(
+                f"{label:9} peak traced memory {peak / 1024 / 1024:8.1f} MiB"
+                f"  {elapsed:6.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
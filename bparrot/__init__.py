@@ -1,7 +1,84 @@
-from bparrot.client import ApplicationClient, BotClient
-from bparrot.core import *
-from bparrot.models import *
-from bparrot.interaction import *
-from bparrot.components import *
+import importlib
 
 __version__ = "0.1.0"
+
+# Submodules are only imported the first time one of their names is accessed,
+# so `import bparrot` does not pull in aiohttp or PyNaCl until they're needed.
+_lazy_names = {
+    "bparrot.client": ["Client", "ApplicationClient", "BotClient"],
+    "bparrot.core": [
+        "verify_key",
+        "slash_command",
+        "user_command",
+        "message_command",
+        "button",
+        "select",
+    ],
+    "bparrot.models": [
+        "DictLoader",
+        "Embed",
+        "Color",
+        "BrandingColor",
+        "User",
+        "Member",
+        "Message",
+        "InteractionMessage",
+        "AllowedMentionTypes",
+        "AllowedMentions",
+    ],
+    "bparrot.interaction": ["Interaction", "InteractionListener"],
+    "bparrot.components": [
+        "ComponentValueError",
+        "ComponentType",
+        "ButtonStyle",
+        "MessageComponent",
+        "Button",
+        "SelectOption",
+        "SelectMenu",
+        "ActionRow",
+        "ComponentInteraction",
+    ],
+    "bparrot.admission": ["AdmissionController", "Priority"],
+    "bparrot.files": ["File"],
+    "bparrot.cooldowns": ["Cooldown", "BucketType"],
+    "bparrot.dedup": ["InteractionDeduplicator"],
+    "bparrot.extensions": ["LazyListener"],
+    "bparrot.host": ["Host"],
+    "bparrot.lag": ["LoopLagMonitor"],
+    "bparrot.loop": ["use_uvloop"],
+    "bparrot.manifest": ["Manifest", "ManifestError"],
+    "bparrot.memo": ["memoize"],
+    "bparrot.pagination": ["Paginator"],
+    "bparrot.profiler": ["Profiler"],
+    "bparrot.recorder": ["InteractionRecorder", "replay", "scrub_pii"],
+    "bparrot.responses": ["ephemeral_response"],
+    "bparrot.retry": ["RetryPolicy", "CircuitBreaker", "CircuitOpen"],
+    "bparrot.state": ["StateStore", "MemoryStateStore", "SQLiteStateStore"],
+    "bparrot.tracing": ["Tracer", "TraceContext", "current_trace"],
+    "bparrot.application_commands": [
+        "SlashCommand",
+        "SlashOption",
+        "SlashOptionType",
+        "UserCommand",
+        "MessageCommand",
+        "get_application_command",
+    ],
+}
+
+_lazy_attrs = {name: module for module, names in _lazy_names.items() for name in names}
+
+__all__ = list(_lazy_attrs)
+
+
+def __getattr__(name):
+    module = _lazy_attrs.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,95 @@
+"""
+Command line tools for bparrot.
+
+    python -m bparrot sync bot:client [--manifest PATH] [--check]
+
+`sync` registers a client's commands with Discord and writes the manifest that
+clients created with `manifest=PATH` serve from. With `--check`, it only
+reports whether the manifest is up to date with the client's commands, without
+calling the API.
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+
+from bparrot.manifest import Manifest, ManifestError, hash_commands
+
+DEFAULT_MANIFEST = "bparrot.manifest.json"
+
+
+def load_client(target: str):
+    module_name, _, attr = target.partition(":")
+    if not attr:
+        raise SystemExit(f"Expected module:client, got {target!r}")
+
+    sys.path.insert(0, os.getcwd())
+    obj = importlib.import_module(module_name)
+    for name in attr.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def check(client, path: str) -> int:
+    client._import_deferred()
+    try:
+        manifest = Manifest.load(path)
+    except (OSError, ManifestError) as e:
+        print(f"Could not load {path}: {e}")
+        return 1
+
+    if (
+        manifest.hash != hash_commands(client._command_payloads())
+        or manifest.modules != client._dump_lazy_modules()
+    ):
+        print(f"{path} is out of date")
+        return 1
+
+    print(f"{path} is up to date ({manifest.hash[:12]})")
+    return 0
+
+
+async def sync(client, path: str) -> int:
+    try:
+        manifest = await client.sync()
+    finally:
+        await client.http_client.close()
+
+    manifest.save(path)
+    count = sum(len(commands) for commands in manifest.commands.values())
+    print(f"Synced {count} commands to {path} ({manifest.hash[:12]})")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bparrot")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = commands.add_parser(
+        "sync", help="Register a client's commands and write its manifest"
+    )
+    sync_parser.add_argument("target", help="The client to sync, as module:attribute")
+    sync_parser.add_argument(
+        "-m",
+        "--manifest",
+        default=DEFAULT_MANIFEST,
+        help=f"Where to write the manifest (default: {DEFAULT_MANIFEST})",
+    )
+    sync_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only check that the manifest matches the client's commands",
+    )
+
+    args = parser.parse_args(argv)
+    client = load_client(args.target)
+
+    if args.check:
+        return check(client, args.manifest)
+    return asyncio.run(sync(client, args.manifest))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import asyncio
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from bparrot.responses import BUSY_MESSAGE, ephemeral_response
+
+
+class Priority:
+    """
+    How important a listener's interactions are. Lower values are more
+    important, and are admitted first and shed last.
+    """
+
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
+# (concurrency limit, queue bound) of each priority class. None is unbounded.
+DEFAULT_LIMITS = {
+    Priority.CRITICAL: (None, None),
+    Priority.HIGH: (64, 256),
+    Priority.NORMAL: (32, 128),
+    Priority.LOW: (8, 32),
+}
+
+
+class _PriorityClass:
+    __slots__ = ("limit", "queue", "running", "waiters")
+
+    def __init__(self, limit: Optional[int], queue: Optional[int]):
+        self.limit = limit
+        self.queue = queue
+        self.running = 0
+        self.waiters = deque()
+
+    def has_capacity(self) -> bool:
+        return self.limit is None or self.running < self.limit
+
+    def queue_full(self) -> bool:
+        return self.queue is not None and len(self.waiters) >= self.queue
+
+
+class AdmissionController:
+    """
+    Admission control in front of interaction handlers. Each priority class
+    runs at most `limit` handlers at once, and queues at most `queue` more.
+    Interactions that can't be queued, or wait more than `max_wait` seconds,
+    are shed: answered with `message` as an ephemeral response.
+
+    When more than `max_queued` interactions are waiting in total, the newest
+    of the lowest priority class is shed, so lower priority work is shed before
+    higher priority work is turned away.
+
+    Priorities without a class of their own are admitted in the next less
+    important class, or the least important one.
+
+    PINGs are always answered straight away, without admission.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[int, Tuple[Optional[int], Optional[int]]] = None,
+        *,
+        max_queued: int = 256,
+        max_wait: float = 2.0,
+        message: str = BUSY_MESSAGE,
+    ):
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._classes = {
+            priority: _PriorityClass(limit, queue)
+            for priority, (limit, queue) in sorted(limits.items())
+        }
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self.queued = 0
+        self.shed = 0
+
+        self.response = ephemeral_response(message)
+
+    def _class(self, priority: int) -> _PriorityClass:
+        cls = self._classes.get(priority)
+        if cls is None:
+            less_important = [p for p in self._classes if p > priority]
+            cls = self._classes[min(less_important, default=max(self._classes))]
+        return cls
+
+    def running(self, priority: int) -> int:
+        return self._class(priority).running
+
+    async def acquire(self, priority: int) -> bool:
+        """
+        Wait for a slot in a priority class. Returns False if the interaction
+        was shed instead; otherwise the slot must be given back with
+        `release()`.
+        """
+        cls = self._class(priority)
+        if cls.has_capacity() and not cls.waiters:
+            cls.running += 1
+            return True
+
+        if cls.queue_full():
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        cls.waiters.append(waiter)
+        self.queued += 1
+        if self.queued > self.max_queued:
+            self._shed_lowest()
+
+        try:
+            await asyncio.wait((waiter,), timeout=self.max_wait)
+        except asyncio.CancelledError:
+            if waiter.done() and waiter.result():
+                self.release(priority)
+            else:
+                self._remove(cls, waiter)
+            raise
+
+        if not waiter.done():
+            self._remove(cls, waiter)
+            self.shed += 1
+            return False
+        return waiter.result()
+
+    def release(self, priority: int):
+        cls = self._class(priority)
+        cls.running -= 1
+        # Slots are handed straight to the next waiter, so that new arrivals
+        # can't overtake the queue.
+        while cls.waiters and cls.has_capacity():
+            waiter = cls.waiters.popleft()
+            self.queued -= 1
+            cls.running += 1
+            waiter.set_result(True)
+
+    def shed_queued(self, below: int = Priority.CRITICAL) -> int:
+        """
+        Shed every queued interaction with a lower priority than `below`,
+        returning how many were shed.
+        """
+        count = 0
+        for priority, cls in self._classes.items():
+            if priority <= below:
+                continue
+            while cls.waiters:
+                cls.waiters.pop().set_result(False)
+                self.queued -= 1
+                count += 1
+        self.shed += count
+        return count
+
+    def _shed_lowest(self):
+        for cls in reversed(self._classes.values()):
+            if cls.waiters:
+                cls.waiters.pop().set_result(False)
+                self.queued -= 1
+                self.shed += 1
+                return
+
+    def _remove(self, cls: _PriorityClass, waiter: asyncio.Future):
+        try:
+            cls.waiters.remove(waiter)
+        except ValueError:
+            return
+        self.queued -= 1
+        waiter.cancel()
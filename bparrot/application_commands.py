@@ -39,7 +39,7 @@ class ApplicationCommand:
 
     def __init__(self, type: ApplicationCommandType, guild_id: int = None, **kwargs):
         self.type = type
-        self.id = kwargs.get("id", 0)
+        self.id = int(kwargs.get("id", 0))
         self.guild_id = guild_id
         self.application_id = kwargs.get("application_id", None)
 
@@ -149,6 +149,9 @@ class SlashCommand(ApplicationCommand):
         self.options = options
         self.default_permission = default_permission
 
+        # Users, members, roles and channels referenced by options, by id.
+        self.resolved = kwargs.get("resolved") or {}
+
     @classmethod
     def from_dict(cls, data):
         if data.get("options"):
@@ -0,0 +1,93 @@
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bparrot.client import Client
+
+_log = logging.getLogger(__name__)
+
+
+class ASGIApp:
+    """
+    An ASGI application serving a client's interactions. Created with
+    `Client.asgi_app()`:
+
+        app = client.asgi_app()
+
+    and run with, for example, `uvicorn bot:app --workers 4`.
+    """
+
+    def __init__(self, client: "Client"):
+        self.client = client
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+
+    async def _http(self, scope, receive, send):
+        if scope["path"] != self.client.interactions_path:
+            return await self._send(send, 404, b"Not Found")
+        if scope["method"] != "POST":
+            return await self._send(send, 405, b"Method Not Allowed")
+
+        signature = timestamp = None
+        for name, value in scope["headers"]:
+            if name == b"x-signature-ed25519":
+                signature = value.decode("latin-1")
+            elif name == b"x-signature-timestamp":
+                timestamp = value.decode("latin-1")
+
+        async def read() -> str:
+            chunks = []
+            while True:
+                message = await receive()
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    return b"".join(chunks).decode()
+
+        response = await self.client.process(read, signature, timestamp)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status,
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in response.headers.items()
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": response.body})
+
+    @staticmethod
+    async def _send(send, status: int, body: bytes):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.client._startup()
+                except Exception as e:
+                    _log.exception("Failed to start client")
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                try:
+                    await self.client.close()
+                except Exception as e:
+                    _log.exception("Failed to close client")
+                    await send({"type": "lifespan.shutdown.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -1,10 +1,11 @@
 import asyncio
-import aiohttp
 
 from bparrot.http import API_ENDPOINT
 
 
-def get_application_token(client_id: int, client_secret: str, scopes: list = []) -> str:
+async def fetch_application_token(
+    client_id: int, client_secret: str, scopes: list = []
+) -> str:
     """
     Get a Bearer token for the application owner via your application's OAuth2
     credentials.
@@ -18,6 +19,8 @@ def get_application_token(client_id: int, client_secret: str, scopes: list = [])
     https://discord.com/developers/docs/topics/oauth2#client-credentials-grant
     """
 
+    import aiohttp
+
     scopes = set(scopes)
     scopes.add("applications.commands")
 
@@ -32,17 +35,21 @@ def get_application_token(client_id: int, client_secret: str, scopes: list = [])
 
     auth = aiohttp.BasicAuth(str(client_id), client_secret)
 
-    async def _make_request():
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{API_ENDPOINT}/oauth2/token",
-                data=data,
-                headers=headers,
-                auth=auth,
-            ) as resp:
-                return await resp.json()
-
-    _loop = asyncio.get_event_loop()
-    _resp_data = _loop.run_until_complete(_make_request())
+    async with aiohttp.ClientSession() as session:
+        async with session.post(
+            f"{API_ENDPOINT}/oauth2/token",
+            data=data,
+            headers=headers,
+            auth=auth,
+        ) as resp:
+            _resp_data = await resp.json()
 
     return _resp_data["access_token"]
+
+
+def get_application_token(client_id: int, client_secret: str, scopes: list = []) -> str:
+    """
+    Blocking version of `fetch_application_token`. Cannot be called from
+    inside a running event loop.
+    """
+    return asyncio.run(fetch_application_token(client_id, client_secret, scopes))
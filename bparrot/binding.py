@@ -0,0 +1,188 @@
+import inspect
+import typing
+from typing import Callable, Dict, List
+
+from bparrot.application_commands import SlashOption, SlashOptionType
+from bparrot.models import Member, User
+
+_MISSING = object()
+
+_NESTED = (SlashOptionType.SUB_COMMAND, SlashOptionType.SUB_COMMAND_GROUP)
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+
+def _resolve_user(inter, user_id, annotation):
+    resolved = inter.data.resolved
+    raw_user = resolved.get("users", {}).get(str(user_id))
+    if raw_user is None:
+        return int(user_id)
+
+    user = User.from_dict(raw_user)
+    raw_member = resolved.get("members", {}).get(str(user_id))
+    if raw_member is None or annotation is User:
+        return user
+    return Member.from_dict({**raw_member, "user": user})
+
+
+def _resolve_mentionable(inter, id_, annotation):
+    if str(id_) in inter.data.resolved.get("users", {}):
+        return _resolve_user(inter, id_, annotation)
+    return _resolve_raw("roles")(inter, id_, annotation)
+
+
+def _resolve_raw(kind: str):
+    def resolve(inter, id_, annotation):
+        return inter.data.resolved.get(kind, {}).get(str(id_), int(id_))
+
+    return resolve
+
+
+def _converter(option_type: int, annotation) -> Callable:
+    """
+    Get the function converting an option's value to what the handler takes,
+    given the option's type and the parameter's annotation.
+    """
+    if option_type == SlashOptionType.INTEGER:
+        return lambda inter, value: int(value)
+    if option_type == SlashOptionType.NUMBER:
+        return lambda inter, value: float(value)
+    if option_type == SlashOptionType.BOOLEAN:
+        return lambda inter, value: _to_bool(value)
+    if option_type == SlashOptionType.STRING:
+        return lambda inter, value: value
+
+    # Entities are resolved from the interaction's resolved data, unless the
+    # handler asks for just their id.
+    if annotation is int:
+        return lambda inter, value: int(value)
+    if option_type == SlashOptionType.USER:
+        resolve = _resolve_user
+    elif option_type == SlashOptionType.MENTIONABLE:
+        resolve = _resolve_mentionable
+    elif option_type == SlashOptionType.CHANNEL:
+        resolve = _resolve_raw("channels")
+    elif option_type == SlashOptionType.ROLE:
+        resolve = _resolve_raw("roles")
+    else:
+        return lambda inter, value: value
+    return lambda inter, value: resolve(inter, value, annotation)
+
+
+def _author_member(inter):
+    raw = inter.author
+    if raw is None:
+        return None
+    return Member.from_dict({**raw, "user": User.from_dict(raw["user"])})
+
+
+def _author_user(inter):
+    raw = inter.author["user"] if inter.author else inter.user
+    return User.from_dict(raw) if raw else None
+
+
+def _guild_id(inter):
+    return int(inter.guild_id) if inter.guild_id else None
+
+
+def _injector(name: str, annotation):
+    """
+    Get the function producing a value for a parameter that isn't an option,
+    from the interaction, or None if it isn't injectable.
+    """
+    from bparrot.interaction import Interaction
+
+    if annotation is Interaction:
+        return lambda inter: inter
+    if annotation is Member:
+        return _author_member
+    if annotation is User:
+        return _author_user
+    if name == "guild_id":
+        return _guild_id
+    return None
+
+
+def _get_hints(handler) -> dict:
+    try:
+        return typing.get_type_hints(handler)
+    except Exception:
+        # Annotations that can't be evaluated are not used for binding.
+        return {}
+
+
+def compile_binder(options: List[SlashOption], handler) -> Callable:
+    """
+    Compile a function binding a slash command interaction to the keyword
+    arguments of `handler`, from the command's options and the handler's
+    signature. The signature is only inspected here, once.
+
+    Option values are converted by their type: integers, numbers and booleans
+    to their Python types, and users, members, channels, roles and mentionables
+    to their resolved data. Options that weren't given are left to the
+    parameter's default, or None if it has none. Parameters annotated as
+    Interaction, Member or User, and a `guild_id` parameter, are given the
+    interaction, the invoking member or user, and the guild id. If the handler
+    takes `**kwargs`, it also gets every other option given, as its raw value.
+    Any other parameter must have a default, or TypeError is raised.
+
+    The first parameter, which is always passed the interaction, is skipped.
+    """
+    if any(option.type in _NESTED for option in options):
+        # Sub-commands are passed as they always were.
+        return lambda inter: inter.get_args()
+
+    option_types = {option.name: option.type for option in options}
+    hints = _get_hints(handler)
+
+    params = list(inspect.signature(handler).parameters.values())[1:]
+    takes_kwargs = any(p.kind == p.VAR_KEYWORD for p in params)
+
+    bound_options = []
+    injected = []
+    for param in params:
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        if param.kind == param.POSITIONAL_ONLY:
+            raise TypeError(f"Cannot bind positional-only parameter {param.name!r}")
+
+        annotation = hints.get(param.name)
+        option_type = option_types.get(param.name)
+        if option_type is None:
+            inject = _injector(param.name, annotation)
+            if inject is not None:
+                injected.append((param.name, inject))
+                continue
+            if param.default is param.empty:
+                raise TypeError(
+                    f"Parameter {param.name!r} of {handler.__qualname__} is not an "
+                    "option of the command and has no default"
+                )
+
+        default = None if param.default is param.empty else _MISSING
+        bound_options.append((param.name, _converter(option_type, annotation), default))
+
+    def bind(inter) -> Dict[str, object]:
+        given = {o.name: o.value for o in inter.data.options}
+        kwargs = {}
+
+        for name, convert, default in bound_options:
+            value = given.pop(name, _MISSING)
+            if value is not _MISSING:
+                kwargs[name] = convert(inter, value)
+            elif default is not _MISSING:
+                kwargs[name] = default
+
+        for name, inject in injected:
+            kwargs[name] = inject(inter)
+
+        if takes_kwargs:
+            kwargs.update(given)
+
+        return kwargs
+
+    return bind
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A size-bounded mapping with least-recently-used eviction, whose entries
+    expire `ttl` seconds after they are set. Every operation is O(1): expired
+    entries are dropped when they are looked up, and the size bound keeps
+    memory flat even when entries are never read again.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: Hashable):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            expires, value = self._data[key]
+        except KeyError:
+            return default
+
+        if expires is not None and expires <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            return self._data.pop(key)[1]
+        except KeyError:
+            return default
+
+    def clear(self):
+        self._data.clear()
+
+    def expire(self) -> int:
+        """
+        Remove every expired entry, returning how many were removed.
+        """
+        now = time.monotonic()
+        expired = [
+            key
+            for key, (expires, _) in self._data.items()
+            if expires is not None and expires <= now
+        ]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+
+class CoalescingCache:
+    """
+    Caches the results of async computations by key in a TTLCache, and
+    coalesces concurrent computations: while a key is being computed, callers
+    asking for the same key wait for that result instead of computing it
+    again. Failed computations are not cached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self._done = TTLCache(maxsize, ttl)
+        self._inflight = {}
+
+        self.hits = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._done)
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self._done.get(key, _MISSING)
+        if cached is not _MISSING:
+            self.hits += 1
+            return cached
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved, in case nobody else is waiting
+            # on it.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            self._done.set(key, result)
+            return result
+        finally:
+            del self._inflight[key]
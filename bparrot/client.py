@@ -1,15 +1,84 @@
-from typing import List
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+)
 import logging
 import asyncio
+import importlib
+import json
+import os
+import sys
+import time
 from asyncio.events import AbstractEventLoop
 
-from aiohttp import web
-
+from bparrot.admission import AdmissionController, Priority
+from bparrot.dedup import InteractionDeduplicator
+from bparrot.extensions import (
+    LazyListener,
+    dump_listener,
+    import_fresh,
+    listeners_in,
+    load_listener,
+)
 from bparrot.http import HTTPClient
-from bparrot.interaction import Interaction
-from bparrot.auth import get_application_token
+from bparrot.interaction import Interaction, InteractionListener
+from bparrot.auth import fetch_application_token
+from bparrot.lag import LoopLagMonitor
+from bparrot.loop import use_uvloop
+from bparrot.manifest import Manifest, ManifestError, hash_commands
+from bparrot.metrics import Metrics
+from bparrot.registry import GLOBAL_SCOPE, CommandRegistry
+from bparrot.retry import RetryPolicy
+from bparrot.tracing import TraceContext, Tracer, span
+from bparrot.application_commands import ApplicationCommand
 from bparrot.core import *
 
+if TYPE_CHECKING:
+    from aiohttp import web
+
+    from bparrot.asgi import ASGIApp
+    from bparrot.profiler import Profiler
+    from bparrot.recorder import InteractionRecorder
+    from bparrot.state import StateStore
+
+_log = logging.getLogger(__name__)
+
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+TEXT_HEADERS = {"Content-Type": "text/plain; charset=utf-8"}
+
+
+class RawResponse(NamedTuple):
+    """
+    A response to an interaction request, ready to be written by whichever
+    server received it.
+    """
+
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+PONG = RawResponse(200, JSON_HEADERS, b'{"type": 1}')
+
+# Index key of a component type's pattern listeners.
+_PATTERNS = object()
+
+
+class DrainResult(NamedTuple):
+    """
+    The outcome of draining a client: how many in-flight requests and
+    background tasks finished before the deadline, and how many did not.
+    """
+
+    completed: int
+    abandoned: int
+
 
 class Client:
     def __init__(
@@ -20,27 +89,338 @@ class Client:
         interactions_path: str = "/",
         guild_ids: List[int] = [],
         loop: AbstractEventLoop = None,
+        uvloop: bool = False,
+        shutdown_timeout: float = 10.0,
+        handler_timeout: float = None,
+        retry_policy: RetryPolicy = None,
+        registry_path: str = None,
+        recorder: "InteractionRecorder" = None,
+        dedup: InteractionDeduplicator = None,
+        state_store: "StateStore" = None,
+        state_ttl: float = None,
+        state_sweep_interval: float = 60.0,
+        tracer: Tracer = None,
+        server_timing: bool = False,
+        profiler: "Profiler" = None,
+        manifest: str = None,
+        admission: AdmissionController = None,
+        lag_monitor: LoopLagMonitor = None,
+        warm_connections: int = 0,
+        keepalive_interval: float = None,
     ):
         self.interaction_listeners = []
 
         self.interactions_path = interactions_path
         self.guild_ids = guild_ids
 
-        if not loop:
-            loop = asyncio.get_event_loop()
+        # The loop is only stored if one is explicitly given. Otherwise, the
+        # client binds to whichever loop is running when it is started.
         self.loop = loop
+        self.uvloop = uvloop
+
+        self._check_credentials(token, public_key)
+
+        self.metrics = Metrics()
+
+        self.http_client = HTTPClient(
+            loop=loop,
+            token=token,
+            token_type=token_type,
+            retry_policy=retry_policy,
+            metrics=self.metrics,
+        )
+
+        self._public_key = public_key
+
+        # Connections to the API opened on startup, and kept open while idle
+        # by refreshing them every `keepalive_interval` seconds.
+        self.warm_connections = warm_connections
+        self.keepalive_interval = keepalive_interval
+        self._keepalive = None
+
+        self.recorder = recorder
+        self.dedup = dedup
+        self.admission = admission
+
+        self.lag_monitor = lag_monitor
+        if lag_monitor is not None:
+            lag_monitor.metrics = self.metrics
+
+        self.tracer = tracer
+        self.server_timing = server_timing
+        self.profiler = profiler
+
+        self.state_store = state_store
+        self.state_ttl = state_ttl
+        self.state_sweep_interval = state_sweep_interval
+        self._sweeper = None
+
+        self.registry = CommandRegistry(registry_path)
+        self.manifest_path = manifest
+        self._listeners_by_id = {}
+        self._index = None
+        self._modules = {}
+
+        # The hash of the command payloads last registered with Discord, or
+        # served from the manifest.
+        self._synced_hash = None
 
+        # Modules whose listeners are lazy: declared up front, and imported on
+        # first use. Modules declared without their listeners are deferred
+        # until startup, which reads them from the manifest, or imports them.
+        self._lazy_listeners = {}
+        self._deferred = {}
+        self._prewarm_modules = []
+        self._prewarm_task = None
+
+        self._app = None
+        self._runner = None
+
+        self.handler_timeout = handler_timeout
+        self._on_timeout = None
+
+        self.shutdown_timeout = shutdown_timeout
+        self._accepting = True
+        self._inflight = set()
+        self._background = set()
+
+    def _check_credentials(self, token: str, public_key: str):
         if not token and not public_key:
             raise Exception("A bot token or public key is required")
+        if not token:
+            _log.warning("Token required for non-interaction response API calls.")
 
-        self.http_client = HTTPClient(loop=loop, token=token, token_type=token_type)
+    async def __aenter__(self):
+        return self
 
-        self._public_key = public_key
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def app(self) -> "web.Application":
+        """
+        The aiohttp web application serving interactions. Created on first
+        access, so that aiohttp is not imported when constructing a client.
+        """
+        if self._app is None:
+            from aiohttp import web
 
-        self.app = web.Application(loop=loop)
+            self._app = web.Application()
+            self._app.router.add_post(self.interactions_path, self._handle_request)
+            if self.profiler is not None:
+                self._app.router.add_get(self.profiler.path, self.profiler.handle)
+            self._app.on_startup.append(self._on_startup)
+            self._app.on_shutdown.append(self._on_shutdown)
+            self._app.on_cleanup.append(self._on_cleanup)
+        return self._app
+
+    def on_timeout(self, func):
+        """
+        Set the function used to build the response when a handler times out,
+        for listeners that don't set their own. Used as a decorator. Takes the
+        interaction, and returns a response.
+        """
+        self._on_timeout = func
+        return func
 
     def add_listener(self, listener):
         self.interaction_listeners.append(listener)
+        self._listeners_by_id.clear()
+        self._index = None
+
+    def load_module(self, name: str) -> List[InteractionListener]:
+        """
+        Import a module and add the listeners defined at its top level, created
+        with the `bparrot.core` decorators. Modules loaded this way can be
+        reloaded while the client is running with `reload()`.
+        """
+        listeners = listeners_in(importlib.import_module(name))
+        for listener in listeners:
+            self.add_listener(listener)
+        self._modules[name] = listeners
+        return listeners
+
+    def lazy_module(
+        self,
+        name: str,
+        interactions: List = None,
+        *,
+        prewarm: bool = False,
+        **kwargs,
+    ) -> Optional[List[LazyListener]]:
+        """
+        Serve the listeners of a module without importing it until one of them
+        is first invoked. The module defines its listeners as for
+        `load_module()`.
+
+        `interactions` declares what the module listens for, as SlashCommand,
+        UserCommand, MessageCommand and ComponentInteraction objects. Without
+        it, the listeners are read from the manifest when the client starts
+        with `manifest=`; otherwise, and when syncing, the module is imported
+        on startup like `load_module()`.
+
+        With `prewarm`, the module is imported in the background once the
+        client has started. Additional keyword arguments are passed to each
+        LazyListener.
+        """
+        if prewarm:
+            self._prewarm_modules.append(name)
+        if interactions is None:
+            self._deferred[name] = kwargs
+            return None
+
+        listeners = [LazyListener(inter, name, **kwargs) for inter in interactions]
+        self._add_lazy(name, listeners)
+        return listeners
+
+    def _add_lazy(self, name: str, listeners: List[LazyListener]):
+        for listener in listeners:
+            self.add_listener(listener)
+        self._lazy_listeners.setdefault(name, []).extend(listeners)
+
+    def _import_deferred(self):
+        """
+        Import the modules declared without their listeners, as they would be
+        with `load_module()`.
+        """
+        for name in self._deferred:
+            if name not in self._modules and name not in self._lazy_listeners:
+                self.load_module(name)
+
+    def _dump_lazy_modules(self) -> Dict[str, List[dict]]:
+        """
+        Describe the listeners of modules declared without them, for the
+        manifest to declare them instead.
+        """
+        return {
+            name: [
+                dump_listener(listener)
+                for listener in self._modules.get(name)
+                or self._lazy_listeners.get(name, ())
+            ]
+            for name in self._deferred
+        }
+
+    async def prewarm(self, *names: str):
+        """
+        Import modules added with `lazy_module()`, all of them by default, so
+        that their first interactions don't wait for the import. Modules are
+        imported one at a time, and failures are logged.
+        """
+        for name in names or tuple(self._lazy_listeners):
+            for listener in self._lazy_listeners.get(name, ()):
+                try:
+                    await listener.load()
+                except Exception:
+                    _log.exception("Failed to prewarm %s", name)
+                    break
+
+    async def reload(self, *names: str) -> bool:
+        """
+        Reimport modules added with `load_module()`, all of them by default,
+        and replace their listeners with the newly defined ones.
+
+        The listener table is swapped in one step once every module has
+        imported successfully; if any fails, the old listeners stay in place.
+        Interactions already being handled finish on the old handlers.
+        Commands are only synced with Discord if their payloads changed since
+        they were last synced, in which case True is returned.
+
+        Modules added with `lazy_module()` are reimported if they have been
+        imported, and their listeners are replaced by ones that find their
+        handlers again on next use.
+        """
+        names = names or (*self._modules, *self._lazy_listeners)
+        unknown = [
+            name
+            for name in names
+            if name not in self._modules and name not in self._lazy_listeners
+        ]
+        if unknown:
+            raise KeyError(
+                f"Modules not loaded with load_module or lazy_module: {unknown}"
+            )
+
+        # Lazy listeners are replaced by new ones rather than reset, so that
+        # interactions they are handling keep their handler and options.
+        lazy = {
+            name: [listener.fresh() for listener in self._lazy_listeners[name]]
+            for name in names
+            if name in self._lazy_listeners
+        }
+        for name in lazy:
+            if name in sys.modules:
+                import_fresh(name)
+        swapped = {
+            id(old): new
+            for name, fresh in lazy.items()
+            for old, new in zip(self._lazy_listeners[name], fresh)
+        }
+
+        names = [name for name in names if name in self._modules]
+        reloaded = {name: listeners_in(import_fresh(name)) for name in names}
+        replaced = {id(l) for name in names for l in self._modules[name]}
+        listeners = [
+            swapped.get(id(l), l)
+            for l in self.interaction_listeners
+            if id(l) not in replaced
+        ]
+        for new_listeners in reloaded.values():
+            listeners.extend(new_listeners)
+
+        # No awaits between here and the end of the swap, so every interaction
+        # sees either the old table or the new one.
+        self.interaction_listeners = listeners
+        self._modules.update(reloaded)
+        self._lazy_listeners.update(lazy)
+        self._listeners_by_id = {}
+        self._apply_registry()
+        self._index = self._build_index()
+
+        _log.info("Reloaded %s", ", ".join((*names, *lazy)))
+
+        # Commands are registered on startup, so they're only synced here once
+        # the client has started.
+        if self._synced_hash in (None, hash_commands(self._command_payloads())):
+            return False
+        if self.manifest_path is not None:
+            _log.warning(
+                "Commands changed on reload; %s is now out of date",
+                self.manifest_path,
+            )
+        await self._register_commands()
+        return True
+
+    async def watch_modules(self, interval: float = 1.0):
+        """
+        Reload modules added with `load_module()` or `lazy_module()` whenever
+        their source files change. Runs until cancelled, e.g. as
+        `client.create_task(...)`. Failed reloads are logged, and the old
+        listeners kept.
+        """
+        mtimes = {}
+        while True:
+            changed = []
+            for name in (*self._modules, *self._lazy_listeners):
+                # Lazy modules are only watched once they have been imported.
+                path = getattr(sys.modules.get(name), "__file__", None)
+                if path is None:
+                    continue
+                try:
+                    mtime = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                if mtimes.setdefault(name, mtime) != mtime:
+                    mtimes[name] = mtime
+                    changed.append(name)
+
+            if changed:
+                try:
+                    await self.reload(*changed)
+                except Exception:
+                    _log.exception("Failed to reload %s", ", ".join(changed))
+
+            await asyncio.sleep(interval)
 
     def slash_command(
         self,
@@ -49,10 +429,12 @@ class Client:
         options: List[SlashOption] = [],
         default_permission: bool = True,
         guild_id: int = None,
+        **kwargs,
     ):
         """
         Create a SlashCommand Listener. Used as a decorator. Takes the same
-        parameters as a SlashCommand object.
+        parameters as a SlashCommand object. Additional keyword arguments are
+        passed to the InteractionListener.
         """
 
         def _deco(func):
@@ -62,70 +444,86 @@ class Client:
                 options=options,
                 default_permission=default_permission,
                 guild_id=guild_id,
+                **kwargs,
             )(func)
             self.add_listener(_cmd)
             return _cmd
 
         return _deco
 
-    def user_command(self, name: str, guild_id: int = None):
+    def user_command(self, name: str, guild_id: int = None, **kwargs):
         """
         Create a UserCommand Listener. Used as a decorator. Takes only the `name`
-        parameter.
+        parameter. Additional keyword arguments are passed to the
+        InteractionListener.
         """
 
         def _deco(func):
-            _cmd = user_command(name, guild_id=guild_id)(func)
+            _cmd = user_command(name, guild_id=guild_id, **kwargs)(func)
             self.add_listener(_cmd)
             return _cmd
 
         return _deco
 
-    def message_command(self, name: str, guild_id: int = None):
+    def message_command(self, name: str, guild_id: int = None, **kwargs):
         """
         Create a MessageCommand Listener. Used as a decorator. Takes only the `name`
-        parameter.
+        parameter. Additional keyword arguments are passed to the
+        InteractionListener.
         """
 
         def _deco(func):
-            _cmd = message_command(name, guild_id=guild_id)(func)
+            _cmd = message_command(name, guild_id=guild_id, **kwargs)(func)
             self.add_listener(_cmd)
             return _cmd
 
         return _deco
 
-    def button(self, custom_id: str):
+    def button(self, custom_id: str = None, *, pattern: str = None, **kwargs):
         """
         Create a ComponentIteraction Listener that is listening for a button of a
-        certain `custom_id`.
+        certain `custom_id`, or with a custom_id fully matching the regular
+        expression `pattern`. Additional keyword arguments are passed to the
+        InteractionListener.
         """
 
+        deco = button(custom_id, pattern=pattern, **kwargs)
+
         def _deco(func):
-            _cmp = button(custom_id)(func)
+            _cmp = deco(func)
             self.add_listener(_cmp)
             return _cmp
 
         return _deco
 
-    def select(self, custom_id: str):
+    def select(self, custom_id: str = None, *, pattern: str = None, **kwargs):
         """
         Create a ComponentIteraction Listener that is listening for a SelectMenu of
-        a certain `custom_id`.
+        a certain `custom_id`, or with a custom_id fully matching the regular
+        expression `pattern`. Additional keyword arguments are passed to the
+        InteractionListener.
         """
 
+        deco = select(custom_id, pattern=pattern, **kwargs)
+
         def _deco(func):
-            _cmp = select(custom_id)(func)
+            _cmp = deco(func)
             self.add_listener(_cmp)
             return _cmp
 
         return _deco
 
-    async def _register_commands(self):
-
+    def _command_payloads(self) -> Dict[str, List[dict]]:
+        """
+        Compile the payloads of every application command listener, by the
+        scope they are registered in: a guild id, or "global".
+        """
         _global = []
         _guilds = {}
 
         for listener in self.interaction_listeners:
+            if not isinstance(listener.inter, ApplicationCommand):
+                continue
             if not listener.inter.guild_id:
                 _global.append(listener.inter.to_dict())
             else:
@@ -134,58 +532,618 @@ class Client:
                     _guilds[guild_id] = []
                 _guilds[guild_id].append(listener.inter.to_dict())
 
+        scopes = {}
         if self.guild_ids:
             for guild in self.guild_ids:
-                await self.http_client.bulk_overwrite_guild_application_commands(
-                    int(guild), _global
-                )
+                scopes[str(guild)] = list(_global)
         else:
-            await self.http_client.bulk_overwrite_global_application_commands(_global)
+            scopes[GLOBAL_SCOPE] = _global
 
         for guild_id, commands in _guilds.items():
-            await self.http_client.bulk_overwrite_guild_application_commands(
-                int(guild_id), commands
-            )
+            # Guild commands are registered after the global commands copied
+            # to that guild, and replace them, as bulk overwrites do.
+            scopes[guild_id] = commands
+
+        return scopes
+
+    async def _register_commands(self, force: bool = False):
+        """
+        Register commands with Discord. Scopes whose payloads are unchanged
+        since the registry last registered them are skipped, unless `force`
+        is given.
+        """
+        payloads = self._command_payloads()
+
+        registered = 0
+        for scope, commands in payloads.items():
+            payload_hash = hash_commands({scope: commands})
+            if not force and self.registry.payload_hash(scope) == payload_hash:
+                continue
+
+            if scope == GLOBAL_SCOPE:
+                resp = (
+                    await self.http_client.bulk_overwrite_global_application_commands(
+                        commands
+                    )
+                )
+                self.registry.update(None, resp, payload_hash)
+            else:
+                resp = await self.http_client.bulk_overwrite_guild_application_commands(
+                    int(scope), commands
+                )
+                self.registry.update(scope, resp, payload_hash)
+            registered += 1
+
+        _log.debug("Registered %d of %d command scopes", registered, len(payloads))
+        if registered and self.registry.path:
+            self.registry.save()
+        self._apply_registry()
+        self._synced_hash = hash_commands(payloads)
+
+    def _apply_registry(self):
+        """
+        Give listeners the command id Discord assigned them, where they have
+        exactly one, so that ApplicationCommand.__eq__ can match on id.
+        """
+        self._listeners_by_id.clear()
+
+        for listener in self.interaction_listeners:
+            inter = listener.inter
+            if isinstance(inter, ApplicationCommand):
+                ids = [
+                    id_
+                    for id_ in self.registry.find(
+                        inter.name, inter.type, inter.guild_id
+                    )
+                    if self._in_scope(inter, self.registry.lookup(id_)[0])
+                ]
+                if len(ids) == 1:
+                    inter.id = ids[0]
+
+    def _get_listener_by_id(self, command_id: int):
+        """
+        Find the listener for a command id using the command registry. Returns
+        None if the id isn't in the registry.
+        """
+        try:
+            return self._listeners_by_id[command_id]
+        except KeyError:
+            pass
+
+        key = self.registry.lookup(command_id)
+        if key is None:
+            return None
+        scope, name, type_ = key
+
+        for listener in self.interaction_listeners:
+            inter = listener.inter
+            if (
+                isinstance(inter, ApplicationCommand)
+                and inter.name == name
+                and inter.type == type_
+                and self._in_scope(inter, scope)
+            ):
+                self._listeners_by_id[command_id] = listener
+                return listener
+        return None
+
+    def _in_scope(self, inter: ApplicationCommand, scope: str) -> bool:
+        """
+        Whether a command registered in `scope` belongs to a listener. Global
+        listeners are registered globally, or copied to each of `guild_ids`
+        that has no guild listeners of its own, which replace them.
+        """
+        if inter.guild_id:
+            return str(inter.guild_id) == scope
+        if scope == GLOBAL_SCOPE:
+            return True
+        return scope in map(str, self.guild_ids) and not any(
+            isinstance(l.inter, ApplicationCommand)
+            and str(l.inter.guild_id or "") == scope
+            for l in self.interaction_listeners
+        )
+
+    def _build_index(self) -> dict:
+        index = {}
+        for listener in self.interaction_listeners:
+            inter = listener.inter
+            if isinstance(inter, ApplicationCommand):
+                key = (2, inter.type, inter.name)
+            elif inter.pattern is not None:
+                key = (3, inter.component_type, _PATTERNS)
+            else:
+                key = (3, inter.component_type, inter.custom_id)
+            index.setdefault(key, []).append(listener)
+        return index
+
+    def _find_listener(self, _json: dict):
+        """
+        Find the listener for a raw interaction payload, without parsing it
+        into an Interaction. Returns None if there isn't exactly one candidate,
+        in which case on_interaction does the full comparison.
+        """
+        data = _json.get("data") or {}
+        type_ = _json.get("type")
+
+        if type_ == 2:
+            if data.get("id"):
+                listener = self._get_listener_by_id(int(data["id"]))
+                if listener is not None:
+                    return listener
+            key = (2, data.get("type", 1), data.get("name"))
+        elif type_ == 3:
+            key = (3, data.get("component_type"), data.get("custom_id"))
+        else:
+            return None
+
+        if self._index is None:
+            self._index = self._build_index()
+
+        candidates = self._index.get(key)
+        if candidates:
+            return candidates[0] if len(candidates) == 1 else None
+
+        if type_ == 3:
+            # Pattern listeners are only tried when no listener is registered
+            # for the exact custom_id, in the order they were added.
+            custom_id = data.get("custom_id") or ""
+            for listener in self._index.get(key[:2] + (_PATTERNS,), ()):
+                if listener.inter.pattern.fullmatch(custom_id):
+                    return listener
+        return None
+
+    def _match_listener(self, inter):
+        """
+        Find the listener for a parsed interaction, comparing it with every
+        listener.
+        """
+        if isinstance(inter.data, ApplicationCommand) and inter.data.id:
+            listener = self._get_listener_by_id(inter.data.id)
+            if listener is not None:
+                return listener
 
-    async def on_interaction(self, inter):
         for listener in self.interaction_listeners:
             if type(listener.inter) is type(inter.data):
                 if listener.inter == inter.data:
-                    return await listener.handle(inter)
+                    return listener
+        return None
+
+    async def on_interaction(self, inter):
+        listener = self._match_listener(inter)
+        if listener is not None:
+            return await listener.handle(inter)
+
+    def create_task(self, coro) -> asyncio.Task:
+        """
+        Schedule background work, such as an `after_response` handler. Tasks
+        created this way are waited on when the client drains.
+        """
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def _handle_request(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        response = await self.process(
+            request.text,
+            request.headers.get("X-Signature-Ed25519"),
+            request.headers.get("X-Signature-Timestamp"),
+        )
+        return web.Response(
+            status=response.status, headers=response.headers, body=response.body
+        )
+
+    async def process(
+        self,
+        read: Callable[[], Awaitable[str]],
+        signature: Optional[str],
+        timestamp: Optional[str],
+        *,
+        payload: dict = None,
+    ) -> RawResponse:
+        """
+        Verify, dispatch and respond to an interaction request, independently
+        of the server it was received by. `read` is called to read the request
+        body, and `signature` and `timestamp` are the values of its
+        X-Signature-Ed25519 and X-Signature-Timestamp headers.
+
+        Servers that have already decoded the body, such as to route it, pass
+        it as `payload`. It is only used once the signature is verified.
+        """
+        if not self._accepting:
+            return RawResponse(503, TEXT_HEADERS, b"Server is shutting down")
+
+        done = asyncio.get_running_loop().create_future()
+        self._inflight.add(done)
+        try:
+            return await self._process_request(read, signature, timestamp, payload)
+        finally:
+            self._inflight.discard(done)
+            if not done.done():
+                done.set_result(None)
+
+    async def _process_request(
+        self, read, signature, timestamp, payload: dict = None
+    ) -> RawResponse:
+        if self.tracer is None and not self.server_timing:
+            return await self._process_traced(read, signature, timestamp, None, payload)
+
+        trace = TraceContext(self.tracer)
+        trace.activate()
+        try:
+            response = await self._process_traced(
+                read, signature, timestamp, trace, payload
+            )
+            if self.server_timing:
+                headers = {**response.headers, "Server-Timing": trace.server_timing()}
+                response = response._replace(headers=headers)
+            return response
+        finally:
+            # Servers may handle every request on a connection in the same
+            # task, so the trace must not leak into the next one.
+            trace.deactivate()
+
+    async def _process_traced(
+        self, read, signature, timestamp, trace: TraceContext, payload: dict = None
+    ) -> RawResponse:
+        with span(trace, "read"):
+            body = await read()
+
+        with span(trace, "verify"):
+            verified = verify_key(self._public_key, body, signature, timestamp)
+        if not verified:
+            return RawResponse(401, TEXT_HEADERS, b"Invalid Request Signature")
+
+        if payload is None:
+            with span(trace, "json"):
+                _json = json.loads(body)
+        else:
+            _json = payload
 
-    async def _handle_request(self, request: web.Request):
+        if trace is not None:
+            trace.interaction_id = _json.get("id")
 
-        body = await request.text()
-        signature = request.headers.get("X-Signature-Ed25519")
-        timestamp = request.headers.get("X-Signature-Timestamp")
-        if not verify_key(self._public_key, body, signature, timestamp):
-            return web.Response(status=401, text="Invalid Request Signature")
+        if self.recorder is None:
+            return await self._dispatch(_json, trace)
 
-        _json = await request.json()
+        received_at = time.time()
+        start = time.perf_counter()
+        response = await self._dispatch(_json, trace)
+        self.recorder.record(
+            body, received_at, time.perf_counter() - start, response.status
+        )
+        return response
 
+    async def _dispatch(self, _json: dict, trace: TraceContext = None) -> RawResponse:
         if _json.get("type") == 1:
-            return web.json_response({"type": 1})
+            return PONG
 
+        if self.dedup is None:
+            body = await self._handle_interaction(_json, trace)
         else:
+            body = await self.dedup.run(
+                _json.get("id"), lambda: self._handle_interaction(_json, trace)
+            )
+        return RawResponse(200, JSON_HEADERS, body)
+
+    async def _handle_interaction(
+        self, _json: dict, trace: TraceContext = None
+    ) -> bytes:
+        inter = None
+        with span(trace, "dispatch"):
+            listener = self._find_listener(_json)
+            if listener is None and _json.get("type") in (2, 3):
+                # Interactions with several candidate listeners are matched in
+                # full here, so that the listener's cooldown and priority still
+                # apply.
+                inter = Interaction(self, _json)
+                listener = self._match_listener(inter)
+
+        if listener is not None and listener.cooldown is not None:
+            if not listener.cooldown.hit(_json):
+                self.metrics.incr("cooldown.rejected")
+                return listener.cooldown.response
+
+        priority = Priority.NORMAL if listener is None else listener.priority
+
+        if (
+            self.lag_monitor is not None
+            and priority > Priority.CRITICAL
+            and self.lag_monitor.overloaded
+        ):
+            self.metrics.incr("lag.shed")
+            if self.admission is not None:
+                # Queued interactions shed here are counted as admission.shed
+                # by the requests waiting on them.
+                self.admission.shed_queued()
+            return self.lag_monitor.response
+
+        if self.admission is None:
+            return await self._run_interaction(listener, _json, trace, inter)
+
+        if not await self.admission.acquire(priority):
+            self.metrics.incr("admission.shed")
+            return self.admission.response
+        try:
+            return await self._run_interaction(listener, _json, trace, inter)
+        finally:
+            self.admission.release(priority)
+
+    async def _run_interaction(
+        self,
+        listener,
+        _json: dict,
+        trace: TraceContext = None,
+        inter: Interaction = None,
+    ) -> bytes:
+        if inter is None:
             inter = Interaction(self, _json)
-            resp = await self.on_interaction(inter) or {}
-            return web.json_response(resp)
+
+        snapshot = None
+        if self.state_store is not None and (
+            inter.type == 3 or (listener is not None and listener.state)
+        ):
+            snapshot = await self._load_state(inter)
+
+        if listener is not None:
+            resp = await listener.handle(inter)
+        else:
+            resp = await self.on_interaction(inter)
+
+        if snapshot is not None:
+            await self._save_state(inter, snapshot)
+
+        # Handlers may return responses they encoded themselves.
+        if isinstance(resp, bytes):
+            return resp
+
+        with span(trace, "encode"):
+            return json.dumps(resp or {}).encode()
+
+    async def _load_state(self, inter: Interaction) -> str:
+        """
+        Load the interaction's session state into `inter.state`, returning its
+        encoded form to tell later whether the handler changed it.
+        """
+        inter.state = await self.state_store.get(inter.session_id, {})
+        return json.dumps(inter.state, sort_keys=True)
+
+    async def _save_state(self, inter: Interaction, snapshot: str):
+        if not inter.state:
+            if snapshot != "{}":
+                await self.state_store.delete(inter.session_id)
+        elif json.dumps(inter.state, sort_keys=True) != snapshot:
+            await self.state_store.set(inter.session_id, inter.state, self.state_ttl)
+
+    async def drain(self, timeout: float = None) -> DrainResult:
+        """
+        Stop accepting new interactions, then wait up to `timeout` seconds
+        (defaults to `shutdown_timeout`) for in-flight requests and background
+        tasks to finish. Background tasks still running at the deadline are
+        cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        timeout = self.shutdown_timeout if timeout is None else timeout
+        deadline = loop.time() + timeout
+
+        self._accepting = False
+
+        finished = set()
+        pending = set()
+        while True:
+            # Handlers finishing during the drain may schedule more background
+            # work, so the set of pending tasks is rebuilt on every pass.
+            pending = (self._inflight | self._background) - finished
+            remaining = deadline - loop.time()
+            if not pending or remaining <= 0:
+                break
+            done, _ = await asyncio.wait(pending, timeout=remaining)
+            finished |= done
+
+        for task in pending:
+            if task in self._background:
+                task.cancel()
+
+        result = DrainResult(completed=len(finished), abandoned=len(pending))
+        self.metrics.incr("drain.completed", result.completed)
+        self.metrics.incr("drain.abandoned", result.abandoned)
+        if result.abandoned:
+            _log.warning(
+                "Drained %d tasks, abandoned %d after %ss",
+                result.completed,
+                result.abandoned,
+                timeout,
+            )
+        else:
+            _log.info("Drained %d tasks", result.completed)
+        return result
 
     async def close(self):
-        await self.http_client.close()
+        """
+        Stop the server if it was started with `start()`, drain in-flight
+        work, and close the HTTP session.
+        """
+        if self._runner is not None:
+            runner, self._runner = self._runner, None
+            await runner.cleanup()
+        else:
+            await self._shutdown()
+            await self._cleanup()
 
-    def _get_app(self) -> web.Application:
-        self.app.router.add_post(self.interactions_path, self._handle_request)
+    def _get_app(self) -> "web.Application":
         return self.app
 
+    def asgi_app(self) -> "ASGIApp":
+        """
+        Get an ASGI application serving interactions, for running the client
+        with an ASGI server such as uvicorn or hypercorn instead of aiohttp.
+        Lifespan startup logs in and registers commands, and lifespan shutdown
+        closes the client.
+        """
+        from bparrot.asgi import ASGIApp
+
+        return ASGIApp(self)
+
+    async def _on_startup(self, app):
+        await self._startup()
+
+    async def _startup(self):
+        await self._pre_run()
+        if self._prewarm_modules:
+            self._prewarm_task = asyncio.create_task(
+                self.prewarm(*self._prewarm_modules)
+            )
+        if self.lag_monitor is not None:
+            self.lag_monitor.start()
+        if self.warm_connections or self.keepalive_interval:
+            self._keepalive = asyncio.create_task(self._keep_warm())
+        if self.state_store is not None:
+            self._sweeper = asyncio.create_task(self._sweep_state())
+
+    async def _on_shutdown(self, app):
+        await self._shutdown()
+
+    async def _on_cleanup(self, app):
+        await self._cleanup()
+
+    async def _shutdown(self):
+        await self.drain()
+        if self.recorder is not None:
+            self.recorder.flush()
+        if self.lag_monitor is not None:
+            self.lag_monitor.stop()
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+            self._keepalive = None
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        if self._prewarm_task is not None:
+            self._prewarm_task.cancel()
+            self._prewarm_task = None
+
+    async def _cleanup(self):
+        await self.http_client.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.state_store is not None:
+            await self.state_store.close()
+
+    async def _keep_warm(self):
+        # Warming up is best effort, so it runs in the background rather than
+        # holding up startup when the API is slow to answer.
+        if self.warm_connections:
+            await self.http_client.warm_up(self.warm_connections)
+        if self.keepalive_interval:
+            await self.http_client.keepalive(
+                self.keepalive_interval, max(self.warm_connections, 1)
+            )
+
+    async def _sweep_state(self):
+        while True:
+            await asyncio.sleep(self.state_sweep_interval)
+            try:
+                removed = await self.state_store.sweep()
+            except Exception:
+                _log.exception("Failed to sweep expired interaction state")
+            else:
+                self.metrics.incr("state.expired", removed)
+
     async def _pre_run(self):
+        if self.manifest_path is not None:
+            self._load_manifest()
+        else:
+            self._import_deferred()
+            try:
+                await self._login()
+                await self._register_commands()
+            except Exception as e:
+                raise e
+
+    async def _login(self):
+        await self.http_client.login()
+        if not self._public_key:
+            self._public_key = self.http_client.get_public_key()
+
+    def _load_manifest(self):
+        """
+        Serve the commands in the manifest without logging in or registering
+        them. The listeners must still compile to the manifest's commands.
+        """
+        manifest = Manifest.load(self.manifest_path)
+
+        for name, kwargs in self._deferred.items():
+            if name in self._modules or name in self._lazy_listeners:
+                continue
+            if name not in manifest.modules:
+                raise ManifestError(
+                    f"Module {name} is not in {self.manifest_path}. "
+                    "Run `python -m bparrot sync` to update it."
+                )
+            self._add_lazy(
+                name,
+                [
+                    load_listener(data, name, **kwargs)
+                    for data in manifest.modules[name]
+                ],
+            )
+
+        if manifest.hash != hash_commands(self._command_payloads()):
+            raise ManifestError(
+                f"Commands have changed since {self.manifest_path} was synced. "
+                "Run `python -m bparrot sync` to update it."
+            )
+
+        if not self._public_key:
+            self._public_key = manifest.public_key
+        if manifest.application_id is not None:
+            self.http_client.application_id = manifest.application_id
+
+        self.registry = manifest.registry
+        self._apply_registry()
+        self._synced_hash = manifest.hash
+
+    async def sync(self) -> Manifest:
+        """
+        Log in, register every command, and return the manifest of what was
+        registered.
+        """
+        self._import_deferred()
+        await self._login()
+        await self._register_commands(force=True)
+        return Manifest.compile(self)
+
+    async def start(self, host: str = "0.0.0.0", port: int = 8080, **kwargs):
+        """
+        Log in, register commands and start serving interactions on the
+        running event loop. Returns once the server is listening; use
+        `close()` (or `async with`) to stop it.
+
+            async with BotClient(token) as client:
+                await client.start(port=8080)
+                await asyncio.Event().wait()
+
+        Additional keyword arguments are passed to aiohttp's `web.TCPSite`.
+        """
+        from aiohttp import web
+
+        if self._runner is not None:
+            raise Exception("Client is already running")
+
+        self._accepting = True
+
+        runner = web.AppRunner(self._get_app())
+        await runner.setup()
+        self._runner = runner
+
         try:
-            await self.http_client.login()
-            if not self._public_key:
-                self._public_key = self.http_client.get_public_key()
-            await self._register_commands()
-        except Exception as e:
-            raise e
+            site = web.TCPSite(runner, host, port, **kwargs)
+            await site.start()
+        except BaseException:
+            await self.close()
+            raise
 
     def run(self, **kwargs):
         """
@@ -194,25 +1152,24 @@ class Client:
 
         https://docs.aiohttp.org/en/stable/deployment.html
         """
+        from aiohttp import web
 
-        try:
-            self.loop.run_until_complete(self._pre_run())
+        if self.uvloop:
+            use_uvloop()
 
-            app = self._get_app()
-            web.run_app(app, **kwargs)
-        except Exception as e:
-            raise e
-        finally:
-            asyncio.run(self.close())
+        # aiohttp 3.7 has no loop parameter, run_app uses the current loop.
+        if self.loop is not None:
+            asyncio.set_event_loop(self.loop)
+
+        web.run_app(self._get_app(), **kwargs)
 
     def run_factory(self):
         """
-        Return a web.Application for running using another web server.
+        Return a web.Application for running using another web server. Login
+        and command registration run as part of the application's startup,
+        on the server's event loop.
         """
-
-        self.loop.run_until_complete(self._pre_run())
-        app = self._get_app()
-        return app
+        return self._get_app()
 
 
 class BotClient(Client):
@@ -224,6 +1181,7 @@ class BotClient(Client):
         interactions_path: str = "/",
         guild_ids: List[int] = [],
         loop: AbstractEventLoop = None,
+        **kwargs,
     ):
         super().__init__(
             public_key=public_key,
@@ -232,6 +1190,7 @@ class BotClient(Client):
             interactions_path=interactions_path,
             guild_ids=guild_ids,
             loop=loop,
+            **kwargs,
         )
 
 
@@ -246,15 +1205,33 @@ class ApplicationClient(Client):
         interactions_path: str = "/",
         guild_ids: List[int] = [],
         loop: AbstractEventLoop = None,
+        **kwargs,
     ):
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._scopes = scopes
 
-        token = get_application_token(client_id, client_secret, scopes)
-
+        # The Bearer token is fetched when the client starts, on the loop the
+        # client runs on, rather than blocking in the constructor.
         super().__init__(
             public_key=public_key,
-            token=token,
+            token=None,
             token_type="Bearer",
             interactions_path=interactions_path,
             guild_ids=guild_ids,
             loop=loop,
+            **kwargs,
         )
+        # Clients serving from a manifest don't log in, and fetch the token
+        # on their first API request instead.
+        self.http_client.token_factory = lambda: fetch_application_token(
+            self._client_id, self._client_secret, self._scopes
+        )
+
+    def _check_credentials(self, token: str, public_key: str):
+        pass
+
+    async def _login(self):
+        if not self.http_client.token:
+            await self.http_client.fetch_token()
+        await super()._login()
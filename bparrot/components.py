@@ -1,3 +1,4 @@
+import re
 from typing import List
 
 
@@ -215,13 +216,27 @@ class ActionRow(MessageComponent):
 
 class ComponentInteraction:
     def __init__(
-        self, custom_id: str, component_type: ComponentType, values: List["str"] = []
+        self,
+        custom_id: str,
+        component_type: ComponentType,
+        values: List["str"] = [],
+        *,
+        pattern: str = None,
     ):
         self.custom_id = custom_id
         self.component_type = component_type
         self.values = values
 
+        # Listeners can match every custom_id fully matching a pattern, rather
+        # than one custom_id.
+        self.pattern = re.compile(pattern) if pattern is not None else None
+
     def __eq__(self, other):
+        if self.pattern is not None:
+            return (
+                self.component_type == other.component_type
+                and self.pattern.fullmatch(other.custom_id or "") is not None
+            )
         return (
             self.custom_id == other.custom_id
             and self.component_type == other.component_type
@@ -0,0 +1,83 @@
+import time
+from typing import Optional
+
+from bparrot.cache import TTLCache
+from bparrot.responses import ephemeral_response
+
+
+class BucketType:
+    """
+    What a cooldown is tracked per.
+    """
+
+    GLOBAL = 0
+    USER = 1
+    GUILD = 2
+    CHANNEL = 3
+
+
+class Cooldown:
+    """
+    A token bucket rate limit for a listener: `rate` uses per `per` seconds,
+    tracked per user, guild, channel or globally.
+
+    Buckets are refilled lazily when they are next used, and kept in an LRU
+    table of at most `maxsize` buckets. A bucket left alone for `per` seconds
+    is full again, so it expires from the table after that long.
+
+    Interactions over the limit are answered with `message` as an ephemeral
+    response, before any option parsing or handler work.
+    """
+
+    def __init__(
+        self,
+        rate: int,
+        per: float,
+        bucket: int = BucketType.USER,
+        *,
+        maxsize: int = 10000,
+        message: str = "You're doing that too fast, try again later.",
+    ):
+        self.rate = rate
+        self.per = per
+        self.bucket = bucket
+
+        self._buckets = TTLCache(maxsize, ttl=per)
+
+        self.response = ephemeral_response(message)
+
+    def get_key(self, payload: dict) -> Optional[str]:
+        """
+        Get the bucket key for a raw interaction payload.
+        """
+        if self.bucket == BucketType.GLOBAL:
+            return "global"
+        if self.bucket == BucketType.GUILD and payload.get("guild_id"):
+            return payload["guild_id"]
+        if self.bucket == BucketType.CHANNEL:
+            return payload.get("channel_id")
+
+        # User buckets, and guild buckets for interactions outside of a guild
+        user = (payload.get("member") or {}).get("user") or payload.get("user") or {}
+        return user.get("id")
+
+    def hit(self, payload: dict, now: Optional[float] = None) -> bool:
+        """
+        Take a token from the interaction's bucket. Returns False if the bucket
+        is empty and the interaction should be rejected.
+        """
+        key = self.get_key(payload)
+        now = time.monotonic() if now is None else now
+
+        state = self._buckets.get(key)
+        if state is None:
+            tokens = self.rate
+        else:
+            tokens, last = state
+            tokens = min(self.rate, tokens + (now - last) * self.rate / self.per)
+
+        if tokens < 1:
+            return False
+
+        self._buckets.set(key, (tokens - 1, now))
+        return True
@@ -1,8 +1,7 @@
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
 import logging
 
-from nacl.signing import VerifyKey
-
 from bparrot.interaction import InteractionListener
 from bparrot.components import ComponentInteraction, ComponentType
 from bparrot.application_commands import (
@@ -16,6 +15,15 @@ from bparrot.application_commands import (
 _log = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _get_verify_key(pk: str):
+    # PyNaCl is imported on first verification rather than at import time, and
+    # the parsed key is reused for every following request.
+    from nacl.signing import VerifyKey
+
+    return VerifyKey(bytes.fromhex(pk))
+
+
 def verify_key(pk: str, body: bytes, signature: str, timestamp: str) -> bool:
     """
     Validate the following headers of an interaction request:
@@ -25,7 +33,7 @@ def verify_key(pk: str, body: bytes, signature: str, timestamp: str) -> bool:
     https://discord.com/developers/docs/interactions/receiving-and-responding#security-and-authorization
     """
 
-    key = VerifyKey(bytes.fromhex(pk))
+    key = _get_verify_key(pk)
 
     try:
         key.verify(f"{timestamp}{body}".encode(), bytes.fromhex(signature))
@@ -41,10 +49,12 @@ def slash_command(
     options: List[SlashOption] = [],
     default_permission: bool = True,
     guild_id: int = None,
+    **kwargs,
 ):
     """
     Create a SlashCommand Listener. Used as a decorator. Takes the same
     parameters as a SlashCommand object. Must be manually added to the Client.
+    Additional keyword arguments are passed to the InteractionListener.
     """
 
     def _deco(func):
@@ -55,67 +65,82 @@ def slash_command(
             default_permission=default_permission,
             guild_id=guild_id,
         )
-        _listener = InteractionListener(_cmd, func)
+        _listener = InteractionListener(_cmd, func, **kwargs)
         return _listener
 
     return _deco
 
 
-def user_command(name: str, guild_id: int = None):
+def user_command(name: str, guild_id: int = None, **kwargs):
     """
     Create a UserCommand Listener. Used as a decorator. Takes only the `name`
-    parameter. Must be manually added to the Client.
+    parameter. Must be manually added to the Client. Additional keyword
+    arguments are passed to the InteractionListener.
     """
 
     def _deco(func):
         _cmd = UserCommand(name, guild_id=guild_id)
-        _listener = InteractionListener(_cmd, func)
+        _listener = InteractionListener(_cmd, func, **kwargs)
         return _listener
 
     return _deco
 
 
-def message_command(name: str, guild_id: int = None):
+def message_command(name: str, guild_id: int = None, **kwargs):
     """
     Create a MessageCommand Listener. Used as a decorator. Takes only the `name`
-    parameter. Must be manually added to the Client.
+    parameter. Must be manually added to the Client. Additional keyword
+    arguments are passed to the InteractionListener.
     """
 
     def _deco(func):
         _cmd = MessageCommand(name, guild_id=guild_id)
-        _listener = InteractionListener(_cmd, func)
+        _listener = InteractionListener(_cmd, func, **kwargs)
         return _listener
 
     return _deco
 
 
-def button(custom_id: str):
+def _check_custom_id(custom_id: Optional[str], pattern: Optional[str]):
+    if (custom_id is None) == (pattern is None):
+        raise ValueError("Exactly one of custom_id and pattern must be given")
+
+
+def button(custom_id: str = None, *, pattern: str = None, **kwargs):
     """
     Create a ComponentIteraction Listener that is listening for a Button of a
-    certain `custom_id`. Must be manually added to the Client.
+    certain `custom_id`, or with a custom_id fully matching the regular
+    expression `pattern`. Must be manually added to the Client. Additional
+    keyword arguments are passed to the InteractionListener.
     """
+    _check_custom_id(custom_id, pattern)
 
     def _deco(func):
         _cmp = ComponentInteraction(
-            custom_id=custom_id, component_type=ComponentType.BUTTON
+            custom_id=custom_id, component_type=ComponentType.BUTTON, pattern=pattern
         )
-        _listener = InteractionListener(_cmp, func)
+        _listener = InteractionListener(_cmp, func, **kwargs)
         return _listener
 
     return _deco
 
 
-def select(custom_id: str):
+def select(custom_id: str = None, *, pattern: str = None, **kwargs):
     """
     Create a ComponentIteraction Listener that is listening for a SelectMenu of
-    a certain `custom_id`. Must be manually added to the Client.
+    a certain `custom_id`, or with a custom_id fully matching the regular
+    expression `pattern`. Must be manually added to the Client. Additional
+    keyword arguments are passed to the InteractionListener.
     """
+    _check_custom_id(custom_id, pattern)
 
     def _deco(func):
         _cmp = ComponentInteraction(
-            custom_id=custom_id, component_type=ComponentType.SELECT_MENU
+            custom_id=custom_id,
+            component_type=ComponentType.SELECT_MENU,
+            pattern=pattern,
         )
-        _listener = InteractionListener(_cmp, func)
+        _listener = InteractionListener(_cmp, func, **kwargs)
         return _listener
 
     return _deco
@@ -0,0 +1,16 @@
+from bparrot.cache import CoalescingCache
+
+
+class InteractionDeduplicator(CoalescingCache):
+    """
+    Makes interaction handling idempotent by interaction id.
+
+    If an interaction is delivered again while the first delivery is still
+    being handled, the duplicate waits for and shares the first result. Once
+    handled, the encoded response is kept for `ttl` seconds (bounded to
+    `maxsize` entries, least recently used evicted first), and duplicates are
+    answered with it without running the handler again.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 900.0):
+        super().__init__(maxsize, ttl)
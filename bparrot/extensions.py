@@ -0,0 +1,273 @@
+import asyncio
+import copy
+import importlib
+import json
+import logging
+import sys
+from types import ModuleType
+from typing import Dict, List, Optional
+
+from bparrot.application_commands import ApplicationCommand, get_application_command
+from bparrot.components import ComponentInteraction
+from bparrot.interaction import InteractionListener
+
+_log = logging.getLogger(__name__)
+
+# Seconds a lazy listener waits for its module to be imported before it
+# defers the interaction, leaving time to respond within Discord's deadline.
+DEFER_AFTER = 2.0
+
+# Imports started by lazy listeners and not finished yet, by module name, so
+# that concurrent first invocations share one import.
+_pending: Dict[str, asyncio.Future] = {}
+
+
+def listeners_in(module: ModuleType) -> List[InteractionListener]:
+    """
+    Return the listeners defined at the top level of a module, such as those
+    created with the `bparrot.core` decorators, in definition order.
+    """
+    seen = set()
+    listeners = []
+    for value in vars(module).values():
+        if isinstance(value, InteractionListener) and id(value) not in seen:
+            seen.add(id(value))
+            listeners.append(value)
+    return listeners
+
+
+def import_fresh(name: str) -> ModuleType:
+    """
+    Import a module, reloading it if it has already been imported.
+    """
+    module = sys.modules.get(name)
+    if module is None:
+        return importlib.import_module(name)
+    return importlib.reload(module)
+
+
+async def import_in_thread(name: str) -> ModuleType:
+    """
+    Import a module in the default executor, so that the event loop keeps
+    serving interactions while the module and its dependencies load. Modules
+    that are already imported are returned straight away.
+    """
+    future = _pending.get(name)
+    if future is None:
+        # Modules are added to sys.modules before they have run, so one
+        # that is still being imported is waited for, by importing it.
+        module = sys.modules.get(name)
+        if module is not None and not getattr(module.__spec__, "_initializing", 0):
+            return module
+
+        loop = asyncio.get_running_loop()
+        future = _pending[name] = loop.run_in_executor(
+            None, importlib.import_module, name
+        )
+        future.add_done_callback(lambda _: _pending.pop(name, None))
+    # A cancelled invocation must not cancel the import other invocations
+    # are waiting on.
+    return await asyncio.shield(future)
+
+
+def _same_interaction(a, b) -> bool:
+    if isinstance(a, ApplicationCommand):
+        return (
+            isinstance(b, ApplicationCommand)
+            and a.type == b.type
+            and a.name == b.name
+            and str(a.guild_id or "") == str(b.guild_id or "")
+        )
+    return (
+        isinstance(b, ComponentInteraction)
+        and a.component_type == b.component_type
+        and a.custom_id == b.custom_id
+        and _pattern(a) == _pattern(b)
+    )
+
+
+def _pattern(inter: ComponentInteraction) -> Optional[str]:
+    return inter.pattern.pattern if inter.pattern is not None else None
+
+
+def _describe(inter) -> str:
+    if isinstance(inter, ApplicationCommand):
+        return f"command {inter.name!r}"
+    if inter.pattern is not None:
+        return f"components matching {inter.pattern.pattern!r}"
+    return f"component {inter.custom_id!r}"
+
+
+class LazyListener(InteractionListener):
+    """
+    A listener for an interaction whose handler is defined in a module that is
+    only imported when the listener is first invoked, or pre-warmed. The module
+    is imported in a thread, and must define a listener for the same command or
+    component with the `bparrot.core` decorators, whose handler then handles
+    every interaction.
+
+    Cooldown, priority and state are checked before the handler runs, so they
+    are this listener's own. Its timeout, memo, `after_response` and
+    `on_timeout` are applied to the module's handler too; the module
+    listener's are only used where this listener has none.
+
+    When the import takes longer than `defer_after` seconds, the interaction
+    is deferred so that Discord's 3 second deadline is not missed, and the
+    handler's response replaces the deferred one once it has run.
+    """
+
+    # Attributes taken from the module's listener when this one has none.
+    _ADOPTED = ("timeout", "memo", "_after_response", "_on_timeout")
+
+    def __init__(
+        self,
+        interaction,
+        module: str,
+        *,
+        defer_after: float = DEFER_AFTER,
+        **kwargs,
+    ):
+        super().__init__(interaction, None, **kwargs)
+        self.module = module
+        self.defer_after = defer_after
+        self._listener = None
+        self._adopted = []
+
+    @property
+    def loaded(self) -> bool:
+        return self._listener is not None
+
+    async def load(self) -> InteractionListener:
+        """
+        Import the module, if it hasn't been already, and find the listener
+        the interaction is handled by.
+        """
+        if self._listener is not None:
+            return self._listener
+
+        module = await import_in_thread(self.module)
+        if self._listener is not None:
+            return self._listener
+
+        for listener in listeners_in(module):
+            if _same_interaction(self.inter, listener.inter):
+                break
+        else:
+            raise LookupError(
+                f"Module {self.module} has no listener for {_describe(self.inter)}"
+            )
+
+        self.handler = listener.handler
+        if hasattr(listener, "_bind"):
+            self._bind = listener._bind
+        self._adopted = [name for name in self._ADOPTED if getattr(self, name) is None]
+        for name in self._adopted:
+            setattr(self, name, getattr(listener, name))
+        self._listener = listener
+        return listener
+
+    def fresh(self) -> "LazyListener":
+        """
+        Return a new listener like this one, which finds its handler again on
+        first use, such as after the module has been reloaded. This listener
+        is left as it is, for the interactions it is still handling.
+        """
+        own = {
+            name.lstrip("_"): getattr(self, name)
+            for name in self._ADOPTED
+            if name not in self._adopted
+        }
+        listener = LazyListener(
+            self.inter,
+            self.module,
+            defer_after=self.defer_after,
+            cooldown=self.cooldown,
+            state=self.state,
+            priority=self.priority,
+            timeout=own.get("timeout"),
+            memo=own.get("memo"),
+        )
+        listener._after_response = own.get("after_response")
+        listener._on_timeout = own.get("on_timeout")
+        return listener
+
+    async def handle(self, inter) -> dict:
+        if self._listener is None:
+            loading = asyncio.ensure_future(self.load())
+            try:
+                await asyncio.wait_for(asyncio.shield(loading), self.defer_after)
+            except asyncio.TimeoutError:
+                inter._client.create_task(self._handle_deferred(inter, loading))
+                # Commands show a "thinking" message, components keep theirs.
+                return inter.create_response(type_=5 if inter.type == 2 else 6)
+        return await super().handle(inter)
+
+    async def _handle_deferred(self, inter, loading: asyncio.Future):
+        """
+        Run the handler once the module is imported, and send its response in
+        place of the deferred one.
+        """
+        http = inter._client.http_client
+        try:
+            await loading
+            resp = await super().handle(inter)
+            # Handlers may return responses they encoded themselves.
+            if isinstance(resp, bytes):
+                resp = json.loads(resp)
+            if not resp or resp["type"] in (1, 5, 6):
+                return
+            if resp["type"] == 4 and inter.type == 3:
+                # The original response is the component's message, which
+                # only an update may replace.
+                await http.send_interaction_followup(
+                    inter.token, resp["data"], parse=None
+                )
+            elif resp["type"] in (4, 7):
+                await http.edit_interaction_message(
+                    inter.token, resp["data"], parse=None
+                )
+            else:
+                _log.warning(
+                    "Cannot send a type %s response to a deferred interaction",
+                    resp["type"],
+                )
+        except Exception:
+            _log.exception("Deferred handler for %s failed", _describe(self.inter))
+
+
+def dump_listener(listener: InteractionListener) -> dict:
+    """
+    Describe a listener's interaction, priority and state as JSON, for a
+    manifest to declare lazy listeners without importing their module.
+    """
+    inter = listener.inter
+    if isinstance(inter, ApplicationCommand):
+        data = {"command": inter.to_dict(), "guild_id": inter.guild_id}
+    else:
+        data = {
+            "component_type": inter.component_type,
+            "custom_id": inter.custom_id,
+            "pattern": _pattern(inter),
+        }
+    data["priority"] = listener.priority
+    data["state"] = listener.state
+    return data
+
+
+def load_listener(data: dict, module: str, **kwargs) -> LazyListener:
+    """
+    Create a lazy listener for `module` from the output of `dump_listener`.
+    """
+    if "command" in data:
+        inter = get_application_command(
+            {**copy.deepcopy(data["command"]), "guild_id": data["guild_id"]}
+        )
+    else:
+        inter = ComponentInteraction(
+            custom_id=data["custom_id"],
+            component_type=data["component_type"],
+            pattern=data["pattern"],
+        )
+    kwargs.setdefault("priority", data["priority"])
+    kwargs.setdefault("state", data["state"])
+    return LazyListener(inter, module, **kwargs)
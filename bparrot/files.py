@@ -0,0 +1,96 @@
+import io
+import os
+from typing import AsyncIterable, BinaryIO, Union
+
+
+class File:
+    """
+    A file to attach to a message.
+
+    `fp` can be a path, a binary file object, or an async iterable of bytes.
+    Files are streamed into the request body in chunks rather than read into
+    memory, so large attachments don't have to be buffered.
+
+    Paths and seekable file objects can be sent again if a request is retried.
+    Async iterables can only be consumed once.
+    """
+
+    def __init__(
+        self,
+        fp: Union[str, os.PathLike, BinaryIO, AsyncIterable[bytes]],
+        filename: str = None,
+        *,
+        description: str = None,
+        spoiler: bool = False,
+    ):
+        self._path = None
+        self._fp = None
+        self._iterable = None
+        self._start = None
+        self._opened = None
+
+        if isinstance(fp, (str, os.PathLike)):
+            self._path = fp
+            filename = filename or os.path.basename(fp)
+        elif isinstance(fp, io.IOBase) or hasattr(fp, "read"):
+            self._fp = fp
+            filename = filename or os.path.basename(getattr(fp, "name", "") or "")
+            if fp.seekable():
+                self._start = fp.tell()
+        elif hasattr(fp, "__aiter__"):
+            self._iterable = fp
+        else:
+            raise TypeError(
+                "File must be a path, a binary file object or an async iterable"
+            )
+
+        if not filename:
+            raise ValueError("A filename is required for this file")
+
+        if spoiler and not filename.startswith("SPOILER_"):
+            filename = f"SPOILER_{filename}"
+
+        self.filename = filename
+        self.description = description
+
+    @property
+    def rewindable(self) -> bool:
+        """
+        Whether the file can be sent more than once.
+        """
+        return self._path is not None or self._start is not None
+
+    def open(self):
+        """
+        Return an object aiohttp can stream as a request body part, starting
+        from the beginning of the file.
+        """
+        if self._path is not None:
+            self.close()
+            self._opened = open(self._path, "rb")
+            return self._opened
+
+        if self._fp is not None:
+            if self._start is not None:
+                self._fp.seek(self._start)
+            return self._fp
+
+        if self._iterable is None:
+            raise ValueError(f"File {self.filename} has already been sent")
+        iterable, self._iterable = self._iterable, None
+        return iterable
+
+    def close(self):
+        """
+        Close the file handle opened for a path. File objects passed in by the
+        caller are left open.
+        """
+        if self._opened is not None:
+            self._opened.close()
+            self._opened = None
+
+    def to_dict(self, id_: int) -> dict:
+        data = {"id": id_, "filename": self.filename}
+        if self.description:
+            data["description"] = self.description
+        return data
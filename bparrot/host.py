@@ -0,0 +1,241 @@
+import asyncio
+import json
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from bparrot.client import Client
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+_log = logging.getLogger(__name__)
+
+
+class Host:
+    """
+    Serve the interactions of many clients from one aiohttp application, event
+    loop and connection pool.
+
+    Clients added with a `path` are served at that path. Other clients share
+    the host's `path`, and each request there is routed by the
+    `application_id` in its payload. A client's application id is taken from
+    `application_id`, or from its login when the host starts. Clients added
+    while the host is running are started straight away, and routed to once
+    they have started.
+
+        host = Host()
+        host.add(BotClient("TOKEN_A"))
+        host.add(BotClient("TOKEN_B"), path="/b")
+        host.run(port=8080)
+    """
+
+    def __init__(
+        self,
+        path: str = "/",
+        *,
+        connection_limit: int = 100,
+    ):
+        self.path = path
+        self.connection_limit = connection_limit
+
+        self.clients: List[Client] = []
+        self._by_path: Dict[str, Client] = {}
+        self._by_application_id: Dict[str, Client] = {}
+        self._pending_ids: List[Client] = []
+        self._starting = set()
+
+        self._session = None
+        self._app = None
+        self._runner = None
+
+    def add(
+        self, client: Client, *, path: str = None, application_id: int = None
+    ) -> Client:
+        """
+        Mount a client on the host, at `path` if given, or routed by its
+        application id otherwise.
+        """
+        if path is not None:
+            if path == self.path or path in self._by_path:
+                raise ValueError(f"Path {path!r} is already in use")
+            self._by_path[path] = client
+        elif application_id is not None:
+            self._add_application_id(client, application_id)
+        else:
+            self._pending_ids.append(client)
+
+        self.clients.append(client)
+        if self._session is not None:
+            task = asyncio.get_running_loop().create_task(self._start_client(client))
+            self._starting.add(task)
+            task.add_done_callback(self._starting.discard)
+        return client
+
+    async def _start_client(self, client: Client):
+        client.http_client.session = self._session
+        try:
+            await client._startup()
+            if client in self._pending_ids:
+                self._resolve_id(client)
+        except Exception:
+            _log.exception("Failed to start a client added to the running host")
+
+    def _add_application_id(self, client: Client, application_id):
+        application_id = str(application_id)
+        if application_id in self._by_application_id:
+            raise ValueError(f"Application {application_id} is already mounted")
+        self._by_application_id[application_id] = client
+
+    @property
+    def app(self) -> "web.Application":
+        if self._app is None:
+            from aiohttp import web
+
+            self._app = web.Application()
+            self._app.router.add_post("/{path:.*}", self._handle_request)
+            self._app.on_startup.append(self._on_startup)
+            self._app.on_shutdown.append(self._on_shutdown)
+            self._app.on_cleanup.append(self._on_cleanup)
+        return self._app
+
+    def _get_client(self, payload: dict) -> Optional[Client]:
+        # Only the top level application_id routes a request; messages and
+        # other objects in the payload can have their own.
+        if not isinstance(payload, dict):
+            return None
+        return self._by_application_id.get(str(payload.get("application_id")))
+
+    async def _handle_request(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        body = await request.text()
+        payload = None
+        if request.path == self.path:
+            # Requests on the shared path are decoded here to be routed, and
+            # the tenant is given the payload, so the body is decoded once.
+            # The tenant then verifies the signature with its own key.
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                pass
+            client = self._get_client(payload)
+        else:
+            client = self._by_path.get(request.path)
+        if client is None:
+            return web.Response(status=404, text="Unknown application")
+
+        async def read():
+            return body
+
+        response = await client.process(
+            read,
+            request.headers.get("X-Signature-Ed25519"),
+            request.headers.get("X-Signature-Timestamp"),
+            payload=payload,
+        )
+        return web.Response(
+            status=response.status, headers=response.headers, body=response.body
+        )
+
+    async def _on_startup(self, app):
+        import aiohttp
+
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.connection_limit)
+        )
+        clients = list(self.clients)
+        started = []
+
+        async def start(client):
+            await client._startup()
+            started.append(client)
+
+        try:
+            for client in clients:
+                client.http_client.session = self._session
+            results = await asyncio.gather(
+                *(start(client) for client in clients), return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            for client in list(self._pending_ids):
+                self._resolve_id(client)
+        except BaseException:
+            # Stop the background work of the clients that did start.
+            await asyncio.gather(*(client._shutdown() for client in started))
+            await self._close_session()
+            raise
+
+        _log.info("Hosting %d applications", len(self.clients))
+
+    def _resolve_id(self, client: Client):
+        """
+        Route to a client added without an application id by the id it logged
+        in with.
+        """
+        application_id = getattr(client.http_client, "application_id", None)
+        if application_id is None:
+            raise ValueError(
+                "An application_id is required for clients that don't log in"
+            )
+        self._add_application_id(client, application_id)
+        self._pending_ids.remove(client)
+
+    async def _on_shutdown(self, app):
+        for task in self._starting:
+            task.cancel()
+        await asyncio.gather(*(client._shutdown() for client in self.clients))
+
+    async def _on_cleanup(self, app):
+        await asyncio.gather(*(client._cleanup() for client in self.clients))
+        await self._close_session()
+
+    async def _close_session(self):
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self, host: str = "0.0.0.0", port: int = 8080, **kwargs):
+        """
+        Start every client and serve them on the running event loop. Returns
+        once the server is listening; use `close()` to stop it.
+        """
+        from aiohttp import web
+
+        if self._runner is not None:
+            raise Exception("Host is already running")
+
+        runner = web.AppRunner(self.app)
+        self._runner = runner
+
+        try:
+            await runner.setup()
+            site = web.TCPSite(runner, host, port, **kwargs)
+            await site.start()
+        except BaseException:
+            await self.close()
+            raise
+
+    async def close(self):
+        if self._runner is not None:
+            runner, self._runner = self._runner, None
+            await runner.cleanup()
+
+    def run(self, **kwargs):
+        """
+        Run every client on one server. Keyword arguments are passed to
+        aiohttp's `web.run_app`.
+        """
+        from aiohttp import web
+
+        web.run_app(self.app, **kwargs)
+
+    def run_factory(self) -> "web.Application":
+        return self.app
@@ -1,13 +1,15 @@
 import sys
 import asyncio
 import logging
+import time
 from asyncio.events import AbstractEventLoop
-from typing import List, Optional
-
-import aiohttp
-from aiohttp import ClientSession
+from collections import Counter
+from typing import Awaitable, Callable, List, Optional
 
 import bparrot
+from bparrot.files import File
+from bparrot.retry import CircuitBreaker, CircuitOpen, RetryPolicy
+from bparrot.tracing import current_trace
 
 API_ENDPOINT = "https://discord.com/api/v9"
 
@@ -30,55 +32,363 @@ class EndpointNotFound(Exception):
         return f"Discord Endpoint {self.endpoint} not found."
 
 
+class HTTPException(Exception):
+    def __init__(self, status: int, text: str):
+        self.status = status
+        self.text = text
+
+    def __str__(self):
+        return f"Discord responded with {self.status}: {self.text}"
+
+
 class HTTPClient:
     def __init__(
         self,
         token: Optional[str] = None,
         token_type: str = "Bot",
         loop: Optional[AbstractEventLoop] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker_threshold: int = 5,
+        breaker_reset_timeout: float = 30.0,
+        metrics=None,
     ):
-        self.loop = loop or asyncio.get_event_loop()
-        self._session = ClientSession(loop=self.loop)
+        self.loop = loop
+        self._session = None
+        self._owns_session = False
+        self._closing = None
+        self.user_agent: Optional[str] = None
+
+        self.token_type = token_type.title()
+        self.token = token
+
+        # Fetches the token on the first authenticated request, if there is no
+        # token yet. An async function returning the token.
+        self.token_factory: Optional[Callable[[], Awaitable[str]]] = None
+        self._fetching_token = None
+
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self._breakers = {}
+
+        self.metrics = metrics
+
+        # Connection pool activity, counted by an aiohttp TraceConfig on
+        # sessions this client creates.
+        self.pool_stats = Counter()
+        self._last_used = 0.0
+
+    @property
+    def session(self):
+        """
+        The underlying aiohttp ClientSession. aiohttp is only imported, and the
+        session only created, once the first request is made.
+
+        A session created elsewhere can be assigned instead, to share its
+        connection pool with other clients. It is then left open when this
+        client is closed, while a session this client created is closed when
+        it is replaced.
+        """
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(trace_configs=[self._trace_config()])
+            self._owns_session = True
+            self._set_user_agent()
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        old = self._session
+        if old is not None and old is not session and self._owns_session:
+            if not old.closed:
+                self._closing = asyncio.get_running_loop().create_task(old.close())
+        self._session = session
+        self._owns_session = False
+        self._set_user_agent()
+
+    def _set_user_agent(self):
+        import aiohttp
 
         user_agent = "DiscordBot (https://github.com/AM2i9/blurple-parrot {0}) Python/{1[0]}.{1[1]} aiohttp/{2}"
-        self.user_agent: str = user_agent.format(
+        self.user_agent = user_agent.format(
             bparrot.__version__, sys.version_info, aiohttp.__version__
         )
 
-        self.token_type = token_type.title()
-        self.token = token
-        if not self.token:
-            _log.warn("Token required for non-interaction response API calls.")
+    def _trace_config(self):
+        import aiohttp
+
+        def counter(name: str):
+            async def on_event(session, ctx, params):
+                self.pool_stats[name] += 1
+                self._incr(f"http.{name}")
+
+            return on_event
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(counter("connections_created"))
+        trace_config.on_connection_reuseconn.append(counter("connections_reused"))
+        trace_config.on_dns_resolvehost_end.append(counter("dns_resolutions"))
+        return trace_config
+
+    def connection_stats(self) -> dict:
+        """
+        Return how many connections have been opened and reused, and how many
+        DNS lookups made, by sessions this client created, along with the
+        proportion of requests that reused a pooled connection.
+        """
+        created = self.pool_stats["connections_created"]
+        reused = self.pool_stats["connections_reused"]
+        return {
+            "connections_created": created,
+            "connections_reused": reused,
+            "dns_resolutions": self.pool_stats["dns_resolutions"],
+            "reuse_ratio": reused / (created + reused) if created + reused else 0.0,
+        }
+
+    async def warm_up(self, connections: int = 2, timeout: float = 5.0):
+        """
+        Open `connections` pooled connections to the API, by making that many
+        concurrent unauthenticated requests, so that the next requests don't
+        pay for DNS, TCP and TLS setup. Requests taking longer than `timeout`
+        seconds are given up on. Failures are logged, not raised.
+        """
+        import aiohttp
+
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+        async def touch():
+            async with self.session.get(
+                f"{API_ENDPOINT}/gateway", timeout=client_timeout
+            ) as resp:
+                await resp.read()
+
+        self._last_used = time.monotonic()
+        results = await asyncio.gather(
+            *(touch() for _ in range(connections)), return_exceptions=True
+        )
+        failed = [r for r in results if isinstance(r, BaseException)]
+        if failed:
+            _log.warning(
+                "Failed to warm up %d of %d connections: %s",
+                len(failed),
+                connections,
+                failed[0],
+            )
+
+    async def keepalive(self, interval: float, connections: int = 1):
+        """
+        Keep `connections` pooled connections open, by warming them up again
+        whenever the client has made no requests for `interval` seconds. Runs
+        until cancelled. The interval should be shorter than the connector's
+        keepalive timeout, which is 15 seconds by default.
+        """
+        while True:
+            idle = time.monotonic() - self._last_used
+            if idle < interval:
+                await asyncio.sleep(interval - idle)
+                continue
+            await self.warm_up(connections)
+
+    async def fetch_token(self) -> str:
+        """
+        Fetch the token with `token_factory`. Concurrent calls share one fetch.
+        """
+        fetch = self._fetching_token
+        if fetch is None:
+            fetch = self._fetching_token = asyncio.ensure_future(self.token_factory())
+        try:
+            self.token = await asyncio.shield(fetch)
+        finally:
+            if fetch.done() and self._fetching_token is fetch:
+                self._fetching_token = None
+        return self.token
+
+    def _get_breaker(self, group: str) -> CircuitBreaker:
+        breaker = self._breakers.get(group)
+        if breaker is None:
+            breaker = self._breakers[group] = CircuitBreaker(
+                self.breaker_threshold, self.breaker_reset_timeout
+            )
+        return breaker
+
+    def breaker_states(self) -> dict:
+        """
+        Return the state of the circuit breaker for each route group that has
+        been requested, e.g. `{"webhooks": "closed", "applications": "open"}`.
+        """
+        return {group: breaker.state for group, breaker in self._breakers.items()}
+
+    def _incr(self, name: str):
+        if self.metrics is not None:
+            self.metrics.incr(name)
+
+    @staticmethod
+    def _multipart(payload: dict, files: List[File]):
+        """
+        Build a multipart/form-data body with the JSON payload and the files.
+        File parts are streamed when the request is sent.
+        """
+        import aiohttp
+
+        payload = dict(payload or {})
+        payload["attachments"] = [f.to_dict(i) for i, f in enumerate(files)]
+
+        form = aiohttp.MultipartWriter("form-data")
+        part = form.append_json(payload)
+        part.set_content_disposition("form-data", name="payload_json")
+
+        for i, f in enumerate(files):
+            part = form.append(f.open())
+            part.set_content_disposition(
+                "form-data", name=f"files[{i}]", filename=f.filename
+            )
+        return form
 
     async def request(
         self,
         method: str,
         route: str,
+        files: Optional[List[File]] = None,
+        parse: Optional[str] = "json",
         **params,
     ):
+        """
+        Make a request to the Discord API. If `files` are given, the request is
+        sent as multipart/form-data with the `json` parameter as its
+        payload_json part.
 
-        headers = params.get("headers", {})
-        if params.get("use_token", True):
-            headers["Authorization"] = f"{self.token_type} {self.token}"
-        params["headers"] = headers
+        Successful responses are decoded from JSON by default. With
+        `parse="raw"`, the body is returned as bytes instead, and with
+        `parse=None` it isn't decoded, and None is returned.
+        """
+        self._last_used = time.monotonic()
 
-        async with self._session.request(
-            method, f"{API_ENDPOINT}{route}", **params
-        ) as resp:
+        trace = current_trace()
+        if trace is None:
+            return await self._request(method, route, files, parse, **params)
+        with trace.span("http", method=method, route=route):
+            return await self._request(method, route, files, parse, **params)
 
-            if resp.status == 204:
-                return None
-            elif resp.status == 404:
-                raise EndpointNotFound(route)
-            elif resp.status == 401:
-                raise NotAuthorized(await resp.text())
-            elif resp.status == 400:
-                raise Exception(f"Bad request: {await resp.json()}")
+    async def _request(
+        self,
+        method: str,
+        route: str,
+        files: Optional[List[File]] = None,
+        parse: Optional[str] = "json",
+        **params,
+    ):
+        import aiohttp
 
-            return await resp.json()
+        if files:
+            payload = params.pop("json", None)
+            # Files that can't be rewound can only be sent once.
+            can_retry = all(f.rewindable for f in files)
+        else:
+            can_retry = True
+
+        headers = params.pop("headers", {})
+        if params.pop("use_token", True):
+            if self.token is None and self.token_factory is not None:
+                await self.fetch_token()
+            headers["Authorization"] = f"{self.token_type} {self.token}"
+        params["headers"] = headers
+
+        # Routes are grouped by their first path segment (applications,
+        # webhooks, oauth2), and each group has its own circuit breaker.
+        group = route.split("/", 2)[1]
+        breaker = self._get_breaker(group)
+
+        attempt = 0
+        while True:
+            probe = breaker.state == breaker.HALF_OPEN
+            if not breaker.allow():
+                self._incr("http.circuit_rejected")
+                raise CircuitOpen(group, breaker.retry_after())
+
+            if files:
+                params["data"] = self._multipart(payload, files)
+
+            accepted = False
+            try:
+                async with self.session.request(
+                    method, f"{API_ENDPOINT}{route}", **params
+                ) as resp:
+
+                    if resp.status == 429:
+                        # Rate limited requests were not processed, so they
+                        # can be retried whatever their method.
+                        breaker.record_success()
+                        if not can_retry or attempt >= self.retry_policy.max_retries:
+                            raise HTTPException(resp.status, await resp.text())
+                        delay = float(resp.headers.get("Retry-After", 1))
+                    elif resp.status >= 500:
+                        breaker.record_failure()
+                        if not can_retry or not self.retry_policy.should_retry(
+                            method, attempt, status=resp.status
+                        ):
+                            raise HTTPException(resp.status, await resp.text())
+                        delay = self.retry_policy.backoff(attempt)
+                    else:
+                        breaker.record_success()
+                        accepted = True
+
+                        if resp.status == 204:
+                            return None
+                        elif resp.status == 404:
+                            raise EndpointNotFound(route)
+                        elif resp.status == 401:
+                            raise NotAuthorized(await resp.text())
+                        elif resp.status == 400:
+                            raise Exception(f"Bad request: {await resp.json()}")
+
+                        if parse == "json":
+                            return await resp.json()
+                        elif parse == "raw":
+                            return await resp.read()
+                        # The body is read even when it isn't wanted, so that
+                        # the connection goes back to the pool.
+                        await resp.read()
+                        return None
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if accepted:
+                    # Discord processed the request, and only reading or
+                    # parsing its response failed: that is no failure of the
+                    # route, and the request must not be sent again.
+                    raise
+                breaker.record_failure()
+                connected = not isinstance(e, aiohttp.ClientConnectorError)
+                if not can_retry or not self.retry_policy.should_retry(
+                    method, attempt, error=e, connected=connected
+                ):
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+
+            except BaseException:
+                # A probe that was cancelled, or failed in a way that doesn't
+                # say anything about Discord, must not hold the circuit half
+                # open forever.
+                if probe:
+                    breaker.release_probe()
+                raise
+
+            finally:
+                for f in files or ():
+                    f.close()
+
+            _log.debug(
+                "Retrying %s %s in %.2fs (attempt %d)", method, route, delay, attempt
+            )
+            self._incr("http.retries")
+            attempt += 1
+            await asyncio.sleep(delay)
 
     async def close(self):
-        await self._session.close()
+        if self._session is not None:
+            session, self._session = self._session, None
+            if self._owns_session:
+                await session.close()
 
     async def login(self):
 
@@ -220,12 +530,22 @@ class HTTPClient:
             json=cmds,
         )
 
-    async def send_interaction_followup(self, token, data: dict):
+    async def send_interaction_followup(
+        self,
+        token,
+        data: dict,
+        files: Optional[List[File]] = None,
+        parse: Optional[str] = "json",
+    ):
         """
         Send a followup message to an interaction.
         """
         return await self.request(
-            "POST", f"/webhooks/{self.application_id}/{self.token}", json=data
+            "POST",
+            f"/webhooks/{self.application_id}/{token}",
+            json=data,
+            files=files,
+            parse=parse,
         )
 
     async def delete_interaction_message(self, token, message="@original"):
@@ -234,18 +554,27 @@ class HTTPClient:
         message.
         """
         return await self.request(
-            "DELETE", f"/webhooks{self.application_id}/{token}/messages/{message}"
+            "DELETE", f"/webhooks/{self.application_id}/{token}/messages/{message}"
         )
 
-    async def edit_interaction_message(self, token, data: dict, message="@original"):
+    async def edit_interaction_message(
+        self,
+        token,
+        data: dict,
+        message="@original",
+        files: Optional[List[File]] = None,
+        parse: Optional[str] = "json",
+    ):
         """
         Edit an interaction response. Defaults to the original message
-        response.
+        response. Any `files` are added as new attachments.
         """
         return await self.request(
             "PATCH",
             f"/webhooks/{self.application_id}/{token}/messages/{message}",
             json=data,
+            files=files,
+            parse=parse,
         )
 
     def get_public_key(self):
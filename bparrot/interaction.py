@@ -1,4 +1,8 @@
 import asyncio
+import inspect
+import logging
+
+from bparrot.admission import Priority
 from bparrot.application_commands import (
     MessageCommand,
     UserCommand,
@@ -7,17 +11,64 @@ from bparrot.application_commands import (
 )
 from typing import Iterable, List, Tuple
 
+from bparrot.binding import compile_binder
 from bparrot.components import ActionRow, ComponentInteraction, ComponentType
+from bparrot.cooldowns import Cooldown
+from bparrot.files import File
+from bparrot.memo import ResponseCache
 from bparrot.models import InteractionMessage, Embed, AllowedMentions
+from bparrot.tracing import current_trace, span, traced
+
+_log = logging.getLogger(__name__)
+
+TIMEOUT_MESSAGE = "This interaction took too long to respond, please try again."
+
+# Message data that Discord accepts as the content of a message on its own;
+# flags, tts and allowed mentions have to come with one of these.
+_CONTENT_KEYS = ("content", "embeds", "components")
 
 
 class InteractionListener:
-    def __init__(self, interaction, handler):
+    def __init__(
+        self,
+        interaction,
+        handler,
+        *,
+        timeout: float = None,
+        cooldown: Cooldown = None,
+        memo: ResponseCache = None,
+        state: bool = False,
+        priority: int = Priority.NORMAL,
+    ):
         self.inter = interaction
         self.handler = handler
 
+        # Seconds the handler may run before it is cancelled and the timeout
+        # response is sent instead. Falls back to the client's handler_timeout.
+        self.timeout = timeout
+        self.cooldown = cooldown
+
+        # Component listeners always get their session state loaded when the
+        # client has a state store. Commands opt in, to set up a new session.
+        self.state = state
+
+        # The priority class the client's admission controller, if it has one,
+        # runs the handler in.
+        self.priority = priority
+
+        # Set by the `memoize` decorator, which may have been applied to the
+        # handler before the listener was created.
+        self.memo = memo or getattr(handler, "__bparrot_memoize__", None)
+
         self._after_response = None
-    
+        self._on_timeout = None
+
+        # Slash command arguments are bound by a function compiled once, here,
+        # from the command's options and the handler's signature. Lazy
+        # listeners have no handler of their own.
+        if handler is not None and isinstance(interaction, SlashCommand):
+            self._bind = compile_binder(interaction.options, handler)
+
     def __getattr__(self, name):
         return getattr(self.inter, name)
 
@@ -27,7 +78,7 @@ class InteractionListener:
         kwargs = {}
 
         if isinstance(inter.data, SlashCommand):
-            kwargs = inter.get_args()
+            kwargs = self._bind(inter)
         elif isinstance(inter.data, UserCommand):
             args = [inter.data.member]
         elif isinstance(inter.data, MessageCommand):
@@ -38,15 +89,79 @@ class InteractionListener:
         ):
             args = [inter.data.values]
 
-        resp = await self.handler(inter, *args, **kwargs)
+        timeout = self.timeout
+        if timeout is None:
+            timeout = inter._client.handler_timeout
+
+        trace = current_trace()
+        try:
+            if self.memo is not None and isinstance(inter.data, SlashCommand):
+                with span(trace, "handler", memoized=True):
+                    resp = await self.memo.run(
+                        self.memo.get_key(inter),
+                        lambda: self._call(inter, args, kwargs, timeout),
+                    )
+                inter._responded = True
+            else:
+                with span(trace, "handler"):
+                    resp = await self._call(inter, args, kwargs, timeout)
+        except asyncio.TimeoutError:
+            if timeout is None:
+                raise
+            return await self._timed_out(inter, timeout)
+
         if self._after_response:
-            asyncio.create_task(self._after_response(inter, *args, **kwargs))
+            coro = self._after_response(inter, *args, **kwargs)
+            if trace is not None:
+                coro = traced(coro, "after_response")
+            inter._client.create_task(coro)
+        return resp
+
+    async def _call(self, inter, args: list, kwargs: dict, timeout: float):
+        coro = self.handler(inter, *args, **kwargs)
+        if timeout is None:
+            return await coro
+        return await asyncio.wait_for(coro, timeout)
+
+    async def _timed_out(self, inter, timeout: float) -> dict:
+        _log.warning(
+            "Handler %s timed out after %ss", self.handler.__qualname__, timeout
+        )
+        inter._client.metrics.incr("handler.timeouts")
+
+        fallback = self._on_timeout or inter._client._on_timeout
+        if fallback is None:
+            return inter.create_response(TIMEOUT_MESSAGE, ephemeral=True)
+
+        resp = fallback(inter)
+        if inspect.isawaitable(resp):
+            resp = await resp
         return resp
 
     def after_response(self, func):
         self._after_response = func
         return func
 
+    def on_timeout(self, func):
+        """
+        Set the function used to build the response when this listener's
+        handler times out. Takes the interaction, and returns a response.
+        """
+        self._on_timeout = func
+        return func
+
+
+def _has_content(data: dict, files: List[File] = None) -> bool:
+    return bool(files) or any(key in data for key in _CONTENT_KEYS)
+
+
+def _get_files(file: File, files: List[File]) -> List[File]:
+    if file and files:
+        raise Exception("Can only use one of 'file' or 'files' parameters at once.")
+    if file:
+        return [file]
+    return files
+
 
 class Interaction:
     def __init__(self, client, data: dict):
@@ -65,11 +180,35 @@ class Interaction:
 
         self.guild_id: int = data.get("guild_id")
         self.author = data.get("member")
+        # Only set in DMs, where there is no member.
+        self.user = data.get("user")
 
         self.channel_id = data.get("channel_id")
+        self.message: dict = data.get("message")
+
+        # Session state, loaded from the client's state store.
+        self.state: dict = None
+
+        self.locale: str = data.get("locale")
+        self.guild_locale: str = data.get("guild_locale")
 
         self._responded = False
 
+    @property
+    def session_id(self) -> str:
+        """
+        The key this interaction's state is stored under. Components share
+        the state of the interaction whose response they are attached to, so
+        a slash command can set up state for the buttons it sends.
+        """
+        message = self.message or {}
+        origin = message.get("interaction_metadata") or message.get("interaction")
+        if origin:
+            return str(origin["id"])
+        if message:
+            return str(message["id"])
+        return str(self.id)
+
     def get_args(self) -> Tuple:
         return {o.name: o.value for o in self.data.options}
 
@@ -88,6 +227,35 @@ class Interaction:
         """
         Send a response to an interaction.
         """
+        data = self._message_data(
+            content,
+            tts=tts,
+            embed=embed,
+            embeds=embeds,
+            allowed_mentions=allowed_mentions,
+            ephemeral=ephemeral,
+            components=components,
+        )
+
+        if (type_ not in (1, 5, 6)) and not _has_content(data):
+            raise Exception("Cannot send empty response.")
+
+        resp = {"type": type_, "data": data}
+
+        self._responded = True
+        return resp
+
+    def _message_data(
+        self,
+        content: str = None,
+        *,
+        tts: bool = False,
+        embed: Embed = None,
+        embeds: List[Embed] = None,
+        allowed_mentions: AllowedMentions = None,
+        ephemeral: bool = False,
+        components: list = [],
+    ) -> dict:
         data = {}
 
         if content:
@@ -113,9 +281,6 @@ class Interaction:
                     raise Exception("Cannot send empty embed.")
                 data["embeds"].append(_emb)
 
-        if (type_ not in (1, 5, 6)) and not data:
-            raise Exception("Cannot send empty response.")
-
         if tts:
             data["tts"] = bool(tts)
 
@@ -141,10 +306,7 @@ class Interaction:
         if allowed_mentions:
             data["allowed_mentions"] = allowed_mentions.to_dict()
 
-        resp = {"type": type_, "data": data}
-
-        self._responded = True
-        return resp
+        return data
 
     def ack(self):
         """
@@ -164,25 +326,32 @@ class Interaction:
         allowed_mentions: list = None,
         ephemeral: bool = False,
         components: list = None,
+        file: File = None,
+        files: List[File] = None,
     ):
         """
         Create a followup message to an interaction. Can only be used after
-        the interaction has already been responded.
+        the interaction has already been responded. Files are streamed to
+        Discord as attachments.
         """
         if not self._responded:
             raise Exception("Cannot send followup message before intial response.")
 
-        data = self.create_response(
+        files = _get_files(file, files)
+        data = self._message_data(
             content=content,
             tts=tts,
             embeds=embeds,
             allowed_mentions=allowed_mentions,
             ephemeral=ephemeral,
             components=components,
-        )["data"]
+        )
+
+        if not _has_content(data, files):
+            raise Exception("Cannot send empty followup message.")
 
         resp = await self._client.http_client.send_interaction_followup(
-            self.token, data
+            self.token, data, files=files, parse="raw"
         )
         resp_message = InteractionMessage(self._client, self, resp)
         return resp_message
@@ -206,23 +375,29 @@ class Interaction:
         allowed_mentions: list = None,
         ephemeral: bool = False,
         components: list = None,
+        file: File = None,
+        files: List[File] = None,
     ):
         """
         Edit the initial response to this interaction. Can only be used after
-        the interaction has already been responded.
+        the interaction has already been responded. Files are streamed to
+        Discord as new attachments.
         """
         if not self._responded:
             raise Exception("Interaction has no initial response.")
 
-        data = self.create_response(
+        files = _get_files(file, files)
+        data = self._message_data(
             content=content,
             tts=tts,
             embeds=embeds,
             allowed_mentions=allowed_mentions,
             ephemeral=ephemeral,
             components=components,
-        )["data"]
+        )
 
-        resp = await self._client.http_client.edit_interaction_message(self.token, data)
+        resp = await self._client.http_client.edit_interaction_message(
+            self.token, data, files=files, parse="raw"
+        )
         resp_message = InteractionMessage(self._client, self, resp)
         return resp_message
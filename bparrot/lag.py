@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from typing import Optional
+
+from bparrot.metrics import Metrics
+from bparrot.responses import BUSY_MESSAGE, ephemeral_response
+
+_log = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop lag: how late a callback scheduled every `interval`
+    seconds runs. The latest measurement is recorded as the `loop.lag` gauge,
+    in seconds, and the largest since the client started as `loop.lag_max`.
+
+    If `shed_threshold` is set, the client sheds new interactions below
+    critical priority while the lag is at or above it, answering them with
+    `message` as an ephemeral response. Work queued for admission is shed
+    too. Both would miss Discord's 3 second deadline anyway.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        *,
+        shed_threshold: Optional[float] = None,
+        message: str = BUSY_MESSAGE,
+    ):
+        self.interval = interval
+        self.shed_threshold = shed_threshold
+        self.metrics: Optional[Metrics] = None
+
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._expected = None
+        self._task = None
+
+        self.response = ephemeral_response(message)
+
+    def current_lag(self) -> float:
+        """
+        The latest measured lag, or how overdue the pending measurement is if
+        that is larger, so a stalled loop is noticed before the sample runs.
+        """
+        if self._expected is None:
+            return self.lag
+        overdue = asyncio.get_running_loop().time() - self._expected
+        return max(self.lag, overdue)
+
+    @property
+    def overloaded(self) -> bool:
+        return (
+            self.shed_threshold is not None
+            and self.current_lag() >= self.shed_threshold
+        )
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._expected = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self._record(max(0.0, loop.time() - self._expected))
+
+    def _record(self, lag: float):
+        crossed = (
+            self.shed_threshold is not None and lag >= self.shed_threshold > self.lag
+        )
+        self.lag = lag
+        self.max_lag = max(self.max_lag, lag)
+
+        if crossed:
+            _log.warning("Event loop lag is %.3fs, shedding load", lag)
+        if self.metrics is not None:
+            self.metrics.set("loop.lag", lag)
+            self.metrics.set("loop.lag_max", self.max_lag)
@@ -0,0 +1,21 @@
+import asyncio
+
+
+def use_uvloop():
+    """
+    Set uvloop's event loop policy as the default, so that every new event loop
+    (including the one created by `Client.run()` or `asyncio.run()`) is a uvloop
+    loop. uvloop is an optional dependency:
+
+        pip install blurple-parrot[uvloop]
+
+    https://github.com/MagicStack/uvloop
+    """
+    try:
+        import uvloop
+    except ImportError as e:
+        raise ImportError(
+            "uvloop is not installed. Install it with 'pip install uvloop'."
+        ) from e
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
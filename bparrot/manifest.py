@@ -0,0 +1,119 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+import bparrot
+from bparrot.registry import CommandRegistry
+
+_log = logging.getLogger(__name__)
+
+
+class ManifestError(Exception):
+    pass
+
+
+def hash_commands(commands: Dict[str, List[dict]]) -> str:
+    """
+    Hash command payloads by scope. The hash only depends on the payloads'
+    content, so it is stable between processes and listener order.
+    """
+    canonical = {
+        scope: sorted(
+            (json.dumps(cmd, sort_keys=True, separators=(",", ":")) for cmd in cmds)
+        )
+        for scope, cmds in commands.items()
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class Manifest:
+    """
+    A client's compiled command payloads by scope, as last synced to Discord,
+    along with everything needed to serve them without calling the API: the
+    application id, public key, and the id of each registered command. It also
+    declares the listeners of modules the client loads lazily, so that they
+    can be served before the modules are imported.
+
+    Manifests are written by `python -m bparrot sync`, and loaded by clients
+    created with `manifest=`.
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        commands: Dict[str, List[dict]],
+        *,
+        application_id: Optional[str] = None,
+        public_key: Optional[str] = None,
+        registry: Optional[CommandRegistry] = None,
+        modules: Optional[Dict[str, List[dict]]] = None,
+    ):
+        self.commands = commands
+        self.hash = hash_commands(commands)
+        self.application_id = application_id
+        self.public_key = public_key
+        self.registry = registry or CommandRegistry()
+        self.modules = modules or {}
+
+    @classmethod
+    def compile(cls, client) -> "Manifest":
+        """
+        Build a manifest from a client's listeners, and the application and
+        command ids it has from logging in and registering its commands.
+        """
+        return cls(
+            client._command_payloads(),
+            application_id=getattr(client.http_client, "application_id", None),
+            public_key=client._public_key or None,
+            registry=client.registry,
+            modules=client._dump_lazy_modules(),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.VERSION,
+            "bparrot": bparrot.__version__,
+            "hash": self.hash,
+            "application_id": self.application_id,
+            "public_key": self.public_key,
+            "commands": self.commands,
+            "ids": self.registry.to_dict()["commands"],
+            "modules": self.modules,
+        }
+
+    @classmethod
+    def load(cls, path: str) -> "Manifest":
+        with open(path) as f:
+            data = json.load(f)
+
+        if data.get("version") != cls.VERSION:
+            raise ManifestError(f"Manifest {path} has an unknown version")
+
+        registry = CommandRegistry()
+        for cmd in data["ids"]:
+            registry.add(cmd["scope"], cmd["name"], cmd["type"], cmd["id"])
+
+        manifest = cls(
+            data["commands"],
+            application_id=data["application_id"],
+            public_key=data["public_key"],
+            registry=registry,
+            modules=data.get("modules"),
+        )
+        if manifest.hash != data["hash"]:
+            raise ManifestError(f"Manifest {path} does not match its hash")
+        return manifest
+
+    def save(self, path: str):
+        """
+        Write the manifest to disk. The file is replaced atomically, so
+        processes loading it never see a partial write.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
@@ -0,0 +1,79 @@
+from typing import Hashable, Tuple
+
+from bparrot.application_commands import SlashOptionType
+from bparrot.cache import CoalescingCache
+
+
+def _flatten_options(options) -> Tuple:
+    flat = []
+    for option in options:
+        if option.type in (
+            SlashOptionType.SUB_COMMAND,
+            SlashOptionType.SUB_COMMAND_GROUP,
+        ):
+            flat.append((option.name, _flatten_options(option.options)))
+        else:
+            flat.append((option.name, getattr(option, "value", None)))
+    return tuple(sorted(flat, key=lambda item: item[0]))
+
+
+class ResponseCache(CoalescingCache):
+    """
+    Caches the responses of a slash command listener by its option values.
+    Concurrent invocations with the same options share a single handler call.
+
+    Used through the `memoize` decorator.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        maxsize: int = 256,
+        *,
+        per_guild: bool = False,
+        per_locale: bool = False,
+    ):
+        super().__init__(maxsize, ttl)
+        self.per_guild = per_guild
+        self.per_locale = per_locale
+
+    def get_key(self, inter) -> Hashable:
+        key = (inter.data.name, _flatten_options(inter.data.options))
+        if self.per_guild:
+            key += (inter.guild_id,)
+        if self.per_locale:
+            key += (inter.locale,)
+        return key
+
+
+def memoize(
+    ttl: float = 60.0,
+    maxsize: int = 256,
+    *,
+    per_guild: bool = False,
+    per_locale: bool = False,
+):
+    """
+    Cache the responses of a slash command whose response only depends on its
+    options. Responses are kept for `ttl` seconds, in an LRU of at most
+    `maxsize` entries. Set `per_guild` or `per_locale` to also key responses on
+    the guild or the user's locale.
+
+    Can be used above or below the listener decorator:
+
+        @client.slash_command(name="convert", description="Convert units")
+        @memoize(ttl=300)
+        async def convert(inter, value: str):
+            ...
+    """
+
+    def _deco(listener_or_func):
+        cache = ResponseCache(ttl, maxsize, per_guild=per_guild, per_locale=per_locale)
+
+        if hasattr(listener_or_func, "handler"):
+            listener_or_func.memo = cache
+        else:
+            listener_or_func.__bparrot_memoize__ = cache
+        return listener_or_func
+
+    return _deco
@@ -0,0 +1,24 @@
+from collections import Counter
+
+
+class Metrics:
+    """
+    In-process counters and gauges recorded by a client, for exporting to a
+    monitoring system.
+    """
+
+    def __init__(self):
+        self.counters = Counter()
+        self.gauges = {}
+
+    def incr(self, name: str, value: int = 1):
+        self.counters[name] += value
+
+    def set(self, name: str, value):
+        self.gauges[name] = value
+
+    def snapshot(self) -> dict:
+        """
+        Return a copy of all current counter and gauge values.
+        """
+        return {**self.counters, **self.gauges}
@@ -1,11 +1,21 @@
-from dataclasses import dataclass
-from typing import List
+import json
+from dataclasses import MISSING, dataclass, fields
+from functools import lru_cache
+from typing import List, Union
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls) -> frozenset:
+    return frozenset(f.name for f in fields(cls))
 
 
 class DictLoader:
     @classmethod
     def from_dict(cls, data: dict):
-        return cls(**data)
+        # Fields Discord adds that the model doesn't know about are dropped,
+        # rather than failing to load.
+        names = _field_names(cls)
+        return cls(**{key: value for key, value in data.items() if key in names})
 
 
 class Embed:
@@ -310,20 +320,61 @@ class Message(DictLoader):
     stickers: list = None
 
 
-class InteractionMessage(Message):
-
+class _LazyField:
     """
-    Represents a Discord message object
+    A Message field of an InteractionMessage, read from the API response the
+    first time it is accessed. The value is then stored on the instance, which
+    takes precedence over this descriptor from then on.
     """
 
-    #! Only a shell of a message object, needs more logic
+    def __init__(self, name: str, default):
+        self.name = name
+        self.default = default
 
-    def __init__(self, _client, inter, data: dict):
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.default
+        value = instance.raw.get(self.name, self.default)
+        instance.__dict__[self.name] = value
+        return value
 
-        super().__init__(**data)
 
+class InteractionMessage(Message):
+    """
+    A message sent in response to an interaction.
+
+    The API response is only decoded when a field is first accessed, so
+    messages whose fields are never read cost nothing to create. Fields hold
+    the API's values as they are, like `Message(**data)`; keys Discord adds
+    that `Message` doesn't know about can be read too.
+    """
+
+    def __init__(self, _client, inter, data: Union[dict, bytes, None]):
+        # Message's fields are not set here, but read lazily from `data`.
         self._client = _client
         self._interaction = inter
+        self._raw = data
+
+    @property
+    def raw(self) -> dict:
+        """
+        The message object as returned by the API.
+        """
+        if not isinstance(self._raw, dict):
+            self._raw = json.loads(self._raw) if self._raw else {}
+        return self._raw
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            value = self.raw[name]
+        except KeyError:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            ) from None
+        self.__dict__[name] = value
+        return value
 
     async def edit(self, content: str = None):
         data = {}
@@ -332,7 +383,7 @@ class InteractionMessage(Message):
             data["content"] = content
 
         resp = await self._client.http_client.edit_interaction_message(
-            (self._interaction.token, data, self.id)
+            self._interaction.token, data, self.id, parse="raw"
         )
         return InteractionMessage(self._client, self._interaction, resp)
 
@@ -342,6 +393,15 @@ class InteractionMessage(Message):
         )
 
 
+for _field in fields(Message):
+    setattr(
+        InteractionMessage,
+        _field.name,
+        _LazyField(_field.name, None if _field.default is MISSING else _field.default),
+    )
+del _field
+
+
 class AllowedMentionTypes:
     none = []
     all = ["everyone", "users", "roles"]
@@ -0,0 +1,155 @@
+import json
+import re
+import secrets
+from typing import Callable, List, Optional, Sequence, Union
+
+from bparrot.cache import TTLCache
+from bparrot.components import ActionRow, Button, ButtonStyle
+from bparrot.core import button
+from bparrot.models import Embed
+from bparrot.responses import ephemeral_response
+
+Page = Union[str, Embed, dict]
+
+UPDATE_MESSAGE = 7
+
+
+def _page_data(page: Page) -> dict:
+    if isinstance(page, str):
+        return {"content": page}
+    if isinstance(page, Embed):
+        return {"embeds": [page.to_dict()]}
+    return dict(page)
+
+
+class _View:
+    __slots__ = ("pages", "count", "encoded")
+
+    def __init__(self, pages, count: int):
+        self.pages = pages
+        self.count = count
+        self.encoded: List[Optional[bytes]] = [None] * count
+
+
+class Paginator:
+    """
+    Paginated messages, navigated with first, previous, next and last buttons.
+
+    Every page of a view is encoded once, as the complete UPDATE_MESSAGE
+    response to the click that shows it, and kept in a TTL cache of at most
+    `maxsize` views, keyed by a short random view id. A single pattern listener
+    answers every click with the cached bytes, without running any handler.
+    Clicks on views that have expired, or that were created by another worker
+    process, are answered with `expired_message` as an ephemeral response.
+
+        paginator = Paginator(client)
+
+        @client.slash_command(name="list", description="List everything")
+        async def list_all(inter):
+            return paginator.respond([Embed(title=f"Page {i}") for i in range(10)])
+
+    Pages are strings, Embeds, or message data dicts. To build pages only when
+    they are first shown, pass a function taking the page index, and `count`.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        *,
+        prefix: str = "bpp",
+        maxsize: int = 1000,
+        ttl: float = 900,
+        expired_message: str = "This message has expired.",
+    ):
+        self.prefix = prefix
+        self._views = TTLCache(maxsize, ttl)
+
+        self.expired_response = ephemeral_response(expired_message)
+
+        self.listener = button(pattern=rf"{re.escape(prefix)}:[^:]+:\d+:[fpnlc]")(
+            self._navigate
+        )
+        if client is not None:
+            client.add_listener(self.listener)
+
+    def respond(
+        self,
+        pages: Union[Sequence[Page], Callable[[int], Page]],
+        *,
+        count: int = None,
+        ephemeral: bool = False,
+    ) -> bytes:
+        """
+        Create a view of `pages`, and return the encoded response showing its
+        first page, for a handler to return.
+        """
+        if callable(pages):
+            if count is None:
+                raise ValueError("count is required when pages is a function")
+            view = _View(pages, count)
+        else:
+            view = _View(None, len(pages))
+        if not view.count:
+            raise ValueError("Cannot paginate no pages")
+
+        view_id = secrets.token_urlsafe(6)
+        first = pages(0) if callable(pages) else pages[0]
+        view.encoded[0] = self._encode(view_id, view, 0, first)
+        if not callable(pages):
+            for index in range(1, view.count):
+                view.encoded[index] = self._encode(view_id, view, index, pages[index])
+        self._views.set(view_id, view)
+
+        data = self._data(view_id, view, 0, first)
+        if ephemeral:
+            data["flags"] = 64
+        return json.dumps({"type": 4, "data": data}).encode()
+
+    def _buttons(self, view_id: str, index: int, count: int) -> dict:
+        def nav(label: str, target: int, tag: str, disabled: bool) -> Button:
+            return Button(
+                style=ButtonStyle.secondary,
+                custom_id=f"{self.prefix}:{view_id}:{target}:{tag}",
+                label=label,
+                disabled=disabled,
+            )
+
+        last = count - 1
+        return ActionRow(
+            [
+                nav("«", 0, "f", index == 0),
+                nav("‹", max(index - 1, 0), "p", index == 0),
+                nav(f"{index + 1}/{count}", index, "c", True),
+                nav("›", min(index + 1, last), "n", index == last),
+                nav("»", last, "l", index == last),
+            ]
+        ).to_dict()
+
+    def _data(self, view_id: str, view: _View, index: int, page: Page) -> dict:
+        data = _page_data(page)
+        data["components"] = [
+            *data.get("components", ()),
+            self._buttons(view_id, index, view.count),
+        ]
+        return data
+
+    def _encode(self, view_id: str, view: _View, index: int, page: Page) -> bytes:
+        data = self._data(view_id, view, index, page)
+        return json.dumps({"type": UPDATE_MESSAGE, "data": data}).encode()
+
+    async def _navigate(self, inter) -> bytes:
+        _, view_id, index, _ = inter.data.custom_id.rsplit(":", 3)
+        index = int(index)
+
+        view = self._views.get(view_id)
+        if view is None or index >= view.count:
+            return self.expired_response
+
+        encoded = view.encoded[index]
+        if encoded is None:
+            encoded = view.encoded[index] = self._encode(
+                view_id, view, index, view.pages(index)
+            )
+        # Views in use stay cached for another `ttl` seconds.
+        self._views.set(view_id, view)
+        return encoded
@@ -0,0 +1,173 @@
+import asyncio
+import hmac
+import io
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+_log = logging.getLogger(__name__)
+
+MODES = ("sample", "cprofile")
+
+
+class Profiler:
+    """
+    An admin route that profiles the running server on demand. Requests must
+    send the shared secret as `Authorization: Bearer <secret>`.
+
+    Query parameters:
+     - `seconds`: How long to capture for, up to `max_duration`. Defaults to 10.
+     - `mode`: `sample` (the default) samples the event loop thread's stack
+       every `interval` seconds from another thread, and returns the stacks in
+       the folded format used by flame graph tools. `cprofile` runs cProfile on
+       the event loop thread and returns its statistics.
+     - `interval`: The sampling interval, in seconds. Defaults to 0.005.
+     - `top`: How many of the lines allocating the most memory during the
+       capture to report, from tracemalloc. 0 disables it. Defaults to 25.
+
+    Only one capture runs at a time. Nothing is profiled between captures.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        *,
+        path: str = "/_bparrot/profile",
+        max_duration: float = 60.0,
+    ):
+        if not secret:
+            raise ValueError("A secret is required to enable the profiler")
+
+        self.secret = secret
+        self.path = path
+        self.max_duration = max_duration
+        self._lock = asyncio.Lock()
+
+    def _authorized(self, request: "web.Request") -> bool:
+        auth = request.headers.get("Authorization", "")
+        return hmac.compare_digest(auth.encode(), f"Bearer {self.secret}".encode())
+
+    async def handle(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        if not self._authorized(request):
+            return web.Response(status=401, text="Unauthorized")
+
+        try:
+            seconds = float(request.query.get("seconds", 10))
+            interval = float(request.query.get("interval", 0.005))
+            top = int(request.query.get("top", 25))
+        except ValueError:
+            return web.Response(status=400, text="Invalid parameters")
+
+        mode = request.query.get("mode", "sample")
+        if mode not in MODES or seconds <= 0 or interval <= 0 or top < 0:
+            return web.Response(status=400, text="Invalid parameters")
+        seconds = min(seconds, self.max_duration)
+
+        if self._lock.locked():
+            return web.Response(status=409, text="A capture is already running")
+
+        async with self._lock:
+            _log.info("Profiling for %.1fs (%s)", seconds, mode)
+            report = await self.capture(seconds, mode, interval=interval, top=top)
+
+        filename = f"bparrot-{mode}-{int(time.time())}.txt"
+        return web.Response(
+            text=report,
+            content_type="text/plain",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    async def capture(
+        self, seconds: float, mode: str = "sample", *, interval=0.005, top=25
+    ) -> str:
+        """
+        Profile the event loop for `seconds`, returning the report.
+        """
+        import tracemalloc
+
+        started_tracemalloc = False
+        if top and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracemalloc = True
+
+        try:
+            if mode == "cprofile":
+                profile = await self._cprofile(seconds)
+            else:
+                profile = await self._sample(seconds, interval)
+
+            allocations = ""
+            if top and tracemalloc.is_tracing():
+                allocations = self._allocations(tracemalloc.take_snapshot(), top)
+        finally:
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+        out = io.StringIO()
+        out.write(f"# bparrot {mode} profile, {seconds:.1f}s\n")
+        out.write(profile)
+        if allocations:
+            out.write(f"\n# Top {top} allocating lines\n")
+            out.write(allocations)
+        return out.getvalue()
+
+    async def _cprofile(self, seconds: float) -> str:
+        import cProfile
+        import pstats
+
+        # cProfile only sees the thread it was enabled on, which is the event
+        # loop's, so every task run during the capture is profiled.
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profile.disable()
+
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(50)
+        return out.getvalue()
+
+    async def _sample(self, seconds: float, interval: float) -> str:
+        loop_thread = threading.get_ident()
+        stacks = Counter()
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(interval):
+                frame = sys._current_frames().get(loop_thread)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                if stack:
+                    stacks[";".join(reversed(stack))] += 1
+
+        thread = threading.Thread(target=sample, name="bparrot-profiler", daemon=True)
+        thread.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            # The sampler only sleeps for one interval at a time.
+            await asyncio.get_running_loop().run_in_executor(None, thread.join)
+
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    @staticmethod
+    def _allocations(snapshot, top: int) -> str:
+        import tracemalloc
+
+        snapshot = snapshot.filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        return "".join(f"{stat}\n" for stat in snapshot.statistics("lineno")[:top])
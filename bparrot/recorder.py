@@ -0,0 +1,388 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import statistics
+import time
+from typing import Callable, Iterator, List, NamedTuple, Optional, Union
+
+_log = logging.getLogger(__name__)
+
+# Keys whose values identify a user, and are replaced when scrubbing PII.
+_ID_KEYS = {"id", "user_id", "guild_id", "channel_id"}
+_TEXT_KEYS = {"username", "global_name", "nick", "email", "avatar", "banner"}
+
+# Keys of resolved channels, roles and attachments holding text users chose.
+_NAME_KEYS = {"name", "topic", "description", "filename", "url", "proxy_url"}
+
+# Option types whose values are user, channel, role, mentionable or
+# attachment ids.
+_ID_OPTION_TYPES = {6, 7, 8, 9, 11}
+
+
+def _pseudonym(value: str) -> str:
+    # A stable stand-in, so scrubbed recordings keep the same number of
+    # distinct users, guilds and channels as the original traffic.
+    digest = hashlib.sha256(str(value).encode()).digest()
+    return str(int.from_bytes(digest[:7], "big"))
+
+
+def _mask(value):
+    """
+    Replace every string in a JSON value with x's of the same length.
+    """
+    if isinstance(value, str):
+        return "x" * len(value)
+    if isinstance(value, list):
+        return [_mask(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _mask(item) for key, item in value.items()}
+    return value
+
+
+def _scrub_user(user: dict):
+    for key in list(user):
+        if key in _ID_KEYS:
+            user[key] = _pseudonym(user[key])
+        elif key in _TEXT_KEYS and user[key]:
+            user[key] = "x" * len(user[key])
+
+
+def _scrub_member(member: dict):
+    _scrub_user(member)
+    if member.get("user"):
+        _scrub_user(member["user"])
+
+
+def _scrub_named(obj: dict):
+    for key in list(obj):
+        if key == "id":
+            obj[key] = _pseudonym(obj[key])
+        elif key in _NAME_KEYS and obj[key]:
+            obj[key] = _mask(obj[key])
+
+
+def _scrub_message(message: dict):
+    if message.get("author"):
+        _scrub_user(message["author"])
+    for user in message.get("mentions") or ():
+        _scrub_member(user)
+    for key in ("content", "embeds", "attachments"):
+        if message.get(key):
+            message[key] = _mask(message[key])
+
+    # The interaction a message responds to names the user who invoked it.
+    for key in ("interaction", "interaction_metadata"):
+        origin = message.get(key)
+        if not origin:
+            continue
+        for user_key in ("user", "member"):
+            if origin.get(user_key):
+                _scrub_member(origin[user_key])
+        if origin.get("user_id"):
+            origin["user_id"] = _pseudonym(origin["user_id"])
+
+
+def _scrub_options(options: list):
+    for option in options:
+        if option.get("options"):
+            _scrub_options(option["options"])
+        value = option.get("value")
+        if value is None:
+            continue
+        if option.get("type") in _ID_OPTION_TYPES:
+            option["value"] = _pseudonym(value)
+        elif isinstance(value, str):
+            option["value"] = _mask(value)
+
+
+def _scrub_inputs(components: list):
+    # Text entered into modal inputs.
+    for component in components:
+        if component.get("components"):
+            _scrub_inputs(component["components"])
+        if isinstance(component.get("value"), str):
+            component["value"] = _mask(component["value"])
+
+
+def scrub_pii(payload: dict) -> dict:
+    """
+    Remove personal information from an interaction payload, in place: user
+    objects, member nicknames, the message a component is attached to, option
+    values and modal inputs, resolved users, members, channels, roles,
+    messages and attachments, and the interaction token. Ids are replaced
+    with stable pseudonyms, and text with x's of the same length. Integer,
+    number and boolean option values are kept.
+    """
+    if payload.get("token"):
+        payload["token"] = "x" * len(payload["token"])
+
+    for key in ("guild_id", "channel_id"):
+        if payload.get(key):
+            payload[key] = _pseudonym(payload[key])
+
+    if payload.get("member"):
+        _scrub_member(payload["member"])
+    if payload.get("user"):
+        _scrub_user(payload["user"])
+    if payload.get("message"):
+        _scrub_message(payload["message"])
+
+    data = payload.get("data") or {}
+    if data.get("options"):
+        _scrub_options(data["options"])
+    if data.get("components"):
+        _scrub_inputs(data["components"])
+
+    resolved = data.get("resolved") or {}
+    if data.get("target_id") and str(data["target_id"]) in (
+        resolved.get("users") or {}
+    ):
+        data["target_id"] = _pseudonym(data["target_id"])
+
+    for kind, scrub in (
+        ("users", _scrub_user),
+        ("members", _scrub_member),
+        ("channels", _scrub_named),
+        ("roles", _scrub_named),
+        ("attachments", _scrub_named),
+    ):
+        objects = resolved.get(kind)
+        if objects:
+            resolved[kind] = {
+                _pseudonym(id_): (scrub(obj) or obj) for id_, obj in objects.items()
+            }
+    for message in (resolved.get("messages") or {}).values():
+        _scrub_message(message)
+
+    return payload
+
+
+class InteractionRecorder:
+    """
+    Appends incoming interaction requests to a line-delimited JSON file, for
+    reproducing real traffic with `replay()`.
+
+    Each line holds the time the request was received (`t`), how long it took
+    to handle in seconds (`d`), the response status (`s`) and the raw request
+    body (`b`). When the file grows past `max_bytes` it is rotated like a
+    logging RotatingFileHandler, keeping `backup_count` old files.
+
+    If `scrub` is True, personal information is removed from bodies with
+    `scrub_pii` before they are written. A function taking and returning the
+    payload dict can be given instead.
+
+    Records are buffered rather than written once per request. They are
+    written to the file at most `flush_interval` seconds after they were
+    recorded, even if no other request comes in, when the client shuts down,
+    and when the recorder is closed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        backup_count: int = 5,
+        scrub: Union[bool, Callable[[dict], dict]] = False,
+        flush_interval: float = 1.0,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        if scrub is True:
+            scrub = scrub_pii
+        self.scrub = scrub or None
+
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._flush_handle = None
+
+        self._file = None
+        self._size = 0
+
+    def _open(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def record(self, body: str, received_at: float, duration: float, status: int):
+        if self.scrub is not None:
+            body = json.dumps(self.scrub(json.loads(body)), separators=(",", ":"))
+
+        line = json.dumps(
+            {"t": received_at, "d": round(duration, 6), "s": status, "b": body},
+            separators=(",", ":"),
+        )
+
+        self._buffer.append(line)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        elif self._flush_handle is None:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Without a running loop nothing could flush the buffer later.
+            self.flush()
+            return
+        delay = self._last_flush + self.flush_interval - time.monotonic()
+        self._flush_handle = loop.call_later(delay, self.flush)
+
+    def flush(self):
+        """
+        Write buffered records to the file.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+
+        if self._file is None:
+            self._open()
+
+        for line in self._buffer:
+            # Lines are ASCII, as json.dumps escapes everything else.
+            if (
+                self.max_bytes
+                and self._size
+                and self._size + len(line) >= self.max_bytes
+            ):
+                self._rotate()
+                self._open()
+            self._file.write(line)
+            self._file.write("\n")
+            self._size += len(line) + 1
+        self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_recording(path: str) -> Iterator[dict]:
+    """
+    Iterate over the records in a recording file.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ReplayResult(NamedTuple):
+    status: int
+    latency: float
+    recorded_status: int
+    recorded_duration: float
+
+
+class ReplayReport:
+    """
+    The results of a replay, compared with the recorded traffic.
+    """
+
+    def __init__(self, results: List[ReplayResult], elapsed: float):
+        self.results = results
+        self.elapsed = elapsed
+
+    @staticmethod
+    def _percentile(values: List[float], pct: float) -> float:
+        if not values:
+            return 0.0
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * pct))]
+
+    def summary(self) -> dict:
+        latencies = [r.latency for r in self.results]
+        recorded = [r.recorded_duration for r in self.results]
+        return {
+            "requests": len(self.results),
+            "elapsed": self.elapsed,
+            "status_mismatches": sum(
+                r.status != r.recorded_status for r in self.results
+            ),
+            "p50": statistics.median(latencies) if latencies else 0.0,
+            "p99": self._percentile(latencies, 0.99),
+            "recorded_p50": statistics.median(recorded) if recorded else 0.0,
+            "recorded_p99": self._percentile(recorded, 0.99),
+        }
+
+
+async def replay(
+    url: str,
+    path: str,
+    signing_key,
+    *,
+    speed: Optional[float] = 1.0,
+    concurrency: int = 100,
+) -> ReplayReport:
+    """
+    Replay a recording against a running client at `url`.
+
+    Every body is signed again with `signing_key` (a PyNaCl SigningKey, or its
+    seed as a hex string), so the client must be using the matching public
+    key. Requests are sent at their recorded offsets divided by `speed`: 1.0
+    replays at the original rate, 2.0 at twice the rate. With `speed=None`
+    requests are sent as fast as `concurrency` allows.
+    """
+    import aiohttp
+    from nacl.signing import SigningKey
+
+    if isinstance(signing_key, str):
+        signing_key = SigningKey(bytes.fromhex(signing_key))
+
+    records = list(read_recording(path))
+    results = [None] * len(records)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    first = records[0]["t"] if records else 0
+
+    async with aiohttp.ClientSession() as session:
+
+        async def send(i: int, record: dict):
+            if speed:
+                await asyncio.sleep(start + (record["t"] - first) / speed - loop.time())
+
+            async with semaphore:
+                timestamp = str(int(time.time()))
+                signature = signing_key.sign(f"{timestamp}{record['b']}".encode())
+                headers = {
+                    "Content-Type": "application/json",
+                    "X-Signature-Ed25519": signature.signature.hex(),
+                    "X-Signature-Timestamp": timestamp,
+                }
+
+                sent_at = loop.time()
+                async with session.post(url, data=record["b"], headers=headers) as resp:
+                    await resp.read()
+                results[i] = ReplayResult(
+                    resp.status, loop.time() - sent_at, record["s"], record["d"]
+                )
+
+        await asyncio.gather(*(send(i, record) for i, record in enumerate(records)))
+
+    return ReplayReport(results, loop.time() - start)
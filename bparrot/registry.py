@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple, Union
+
+_log = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "global"
+
+RegistryKey = Tuple[str, str, int]
+
+
+class CommandRegistry:
+    """
+    Maps registered application commands, by (scope, name, type), to the
+    snowflake id Discord assigned them. The scope is a guild id, or "global".
+
+    If a path is given, the registry is loaded from it when created and can be
+    saved back to it, so that restarted and additional worker processes can
+    dispatch by command id without having to register commands first. The
+    hash of the payloads each scope was registered with is saved too, so that
+    scopes whose commands haven't changed aren't registered again.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+
+        self._ids: Dict[RegistryKey, int] = {}
+        self._keys: Dict[int, RegistryKey] = {}
+        self._hashes: Dict[str, str] = {}
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self._ids)
+
+    @staticmethod
+    def _scope(scope: Union[int, str, None]) -> str:
+        return str(scope) if scope else GLOBAL_SCOPE
+
+    def add(self, scope: Union[int, str, None], name: str, type_: int, id_: int):
+        key = (self._scope(scope), name, int(type_))
+
+        old_id = self._ids.get(key)
+        if old_id is not None:
+            self._keys.pop(old_id, None)
+
+        self._ids[key] = int(id_)
+        self._keys[int(id_)] = key
+
+    def update(
+        self,
+        scope: Union[int, str, None],
+        commands: List[dict],
+        payload_hash: Optional[str] = None,
+    ):
+        """
+        Replace the commands registered in `scope` with the application command
+        objects Discord returned when overwriting them, and the hash of the
+        payloads they were registered with.
+        """
+        scope = self._scope(scope)
+        if payload_hash is None:
+            self._hashes.pop(scope, None)
+        else:
+            self._hashes[scope] = payload_hash
+        for key in [key for key in self._ids if key[0] == scope]:
+            self._keys.pop(self._ids.pop(key), None)
+
+        for cmd in commands:
+            self.add(scope, cmd["name"], cmd.get("type", 1), cmd["id"])
+
+    def payload_hash(self, scope: Union[int, str, None]) -> Optional[str]:
+        """
+        Return the hash of the payloads a scope was last registered with.
+        """
+        return self._hashes.get(self._scope(scope))
+
+    def get(self, scope: Union[int, str, None], name: str, type_: int) -> Optional[int]:
+        return self._ids.get((self._scope(scope), name, int(type_)))
+
+    def find(self, name: str, type_: int, guild_id: Union[int, str, None] = None):
+        """
+        Return the ids of every registered command with this name and type. If
+        a guild id is given, only that guild's commands are included.
+        """
+        return [
+            id_
+            for (scope, _name, _type), id_ in self._ids.items()
+            if _name == name
+            and _type == int(type_)
+            and (not guild_id or scope == str(guild_id))
+        ]
+
+    def lookup(self, id_: Union[int, str]) -> Optional[RegistryKey]:
+        """
+        Return the (scope, name, type) of a command id, if it is known.
+        """
+        return self._keys.get(int(id_))
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.VERSION,
+            "commands": [
+                {"scope": scope, "name": name, "type": type_, "id": str(id_)}
+                for (scope, name, type_), id_ in self._ids.items()
+            ],
+            "hashes": self._hashes,
+        }
+
+    def load(self, path: Optional[str] = None):
+        path = path or self.path
+        with open(path) as f:
+            data = json.load(f)
+
+        if data.get("version") != self.VERSION:
+            _log.warning("Ignoring command registry %s with unknown version", path)
+            return
+
+        self._ids.clear()
+        self._keys.clear()
+        self._hashes = dict(data.get("hashes", {}))
+        for cmd in data["commands"]:
+            self.add(cmd["scope"], cmd["name"], cmd["type"], cmd["id"])
+
+    def save(self, path: Optional[str] = None):
+        """
+        Write the registry to disk. The file is replaced atomically, so
+        processes loading it never see a partial write.
+        """
+        path = path or self.path
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
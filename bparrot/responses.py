@@ -0,0 +1,12 @@
+import json
+
+BUSY_MESSAGE = "The bot is busy right now, try again in a moment."
+
+
+def ephemeral_response(message: str) -> bytes:
+    """
+    Encode a response showing `message` only to the user who invoked the
+    interaction. Handlers and the client can return it as is, so responses
+    sent often are encoded once rather than per interaction.
+    """
+    return json.dumps({"type": 4, "data": {"content": message, "flags": 64}}).encode()
@@ -0,0 +1,132 @@
+import random
+import time
+from typing import Iterable, Optional
+
+
+class CircuitOpen(Exception):
+    """
+    Raised instead of making a request while the circuit breaker for its route
+    group is open.
+    """
+
+    def __init__(self, group: str, retry_after: float):
+        self.group = group
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return (
+            f"Circuit for '{self.group}' routes is open, "
+            f"retry in {self.retry_after:.1f}s."
+        )
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request to Discord is retried, and how long to
+    wait before doing so.
+
+    Delays use exponential backoff with full jitter: before retry `n` the client
+    waits a random time between 0 and `min(max_delay, base_delay * 2 ** n)`.
+
+    Requests that fail with a 5xx status or a dropped connection are only
+    retried for idempotent methods, so that a POST followup is never sent
+    twice. A request that could not connect at all never reached Discord, and
+    is retried regardless of its method.
+    """
+
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"})
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        retry_statuses: Iterable[int] = (500, 502, 503, 504),
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+        *,
+        status: Optional[int] = None,
+        error: Optional[Exception] = None,
+        connected: bool = True,
+    ) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if error is not None and not connected:
+            return True
+        if status is not None and status not in self.retry_statuses:
+            return False
+        return method.upper() in self.IDEMPOTENT_METHODS
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens, and
+    requests are rejected for `reset_timeout` seconds. The circuit then becomes
+    half open, and a single probe request is let through: if it succeeds the
+    circuit closes, otherwise it opens again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def retry_after(self) -> float:
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self):
+        """
+        Let another probe through, after one ended without an outcome, such as
+        when it was cancelled.
+        """
+        self._probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._probing = False
@@ -0,0 +1,169 @@
+import abc
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from bparrot.cache import TTLCache
+
+
+class StateStore(abc.ABC):
+    """
+    Stores state for component interaction sessions, such as the contents of
+    a view that a button changes. Values must be JSON serializable, and expire
+    after their ttl.
+
+    Subclasses implement the batched methods; `get` and `set` are shortcuts
+    for a single key.
+    """
+
+    @abc.abstractmethod
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Return the values of every key that is set and not expired.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        ...
+
+    @abc.abstractmethod
+    async def delete_many(self, keys: Iterable[str]):
+        ...
+
+    @abc.abstractmethod
+    async def sweep(self) -> int:
+        """
+        Remove expired values, returning how many were removed.
+        """
+        ...
+
+    async def close(self):
+        pass
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        return (await self.get_many([key])).get(key, default)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        await self.set_many({key: value}, ttl)
+
+    async def delete(self, key: str):
+        await self.delete_many([key])
+
+
+class MemoryStateStore(StateStore):
+    """
+    A state store local to the process, for clients running a single worker.
+    Holds at most `maxsize` sessions, evicting the least recently used.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: Optional[float] = 900.0):
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        values = {}
+        for key in keys:
+            raw = self._cache.get(key)
+            if raw is not None:
+                # Stored encoded, so callers can't mutate the stored value.
+                values[key] = json.loads(raw)
+        return values
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        for key, value in items.items():
+            self._cache.set(key, json.dumps(value), ttl)
+
+    async def delete_many(self, keys: Iterable[str]):
+        for key in keys:
+            self._cache.pop(key)
+
+    async def sweep(self) -> int:
+        return self._cache.expire()
+
+
+class SQLiteStateStore(StateStore):
+    """
+    A state store in a local SQLite database, shared by every worker process
+    on the host without needing an external service. The database is opened
+    in WAL mode, so readers in one process don't block writers in another.
+
+    Queries run in a worker thread, to keep disk access off the event loop.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = 900.0):
+        self.path = path
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS bparrot_state "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS bparrot_state_expires "
+                "ON bparrot_state (expires)"
+            )
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    def _get_many(self, keys: list) -> Dict[str, Any]:
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT key, value FROM bparrot_state WHERE key IN ({placeholders}) "
+                "AND (expires IS NULL OR expires > ?)",
+                (*keys, time.time()),
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def _set_many(self, items: Dict[str, Any], ttl: Optional[float]):
+        expires = time.time() + ttl if ttl is not None else None
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO bparrot_state (key, value, expires) "
+                "VALUES (?, ?, ?)",
+                [(key, json.dumps(value), expires) for key, value in items.items()],
+            )
+
+    def _delete_many(self, keys: list):
+        with self._lock, self._db:
+            self._db.executemany(
+                "DELETE FROM bparrot_state WHERE key = ?", [(key,) for key in keys]
+            )
+
+    def _sweep(self) -> int:
+        with self._lock, self._db:
+            return self._db.execute(
+                "DELETE FROM bparrot_state WHERE expires <= ?", (time.time(),)
+            ).rowcount
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        return await self._run(self._get_many, keys)
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        if items:
+            await self._run(self._set_many, items, self.ttl if ttl is None else ttl)
+
+    async def delete_many(self, keys: Iterable[str]):
+        keys = list(keys)
+        if keys:
+            await self._run(self._delete_many, keys)
+
+    async def sweep(self) -> int:
+        return await self._run(self._sweep)
+
+    async def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,132 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+_current_trace: ContextVar[Optional["TraceContext"]] = ContextVar(
+    "bparrot_trace", default=None
+)
+
+
+class Tracer:
+    """
+    Receives the start and end of each phase of handling an interaction:
+    reading the request, verifying its signature, decoding JSON, dispatching,
+    running the handler, encoding the response, outbound HTTP calls and
+    `after_response` work.
+
+    Subclass this to forward phases to your own tracing system. The trace
+    context passed to each call is shared by every phase of one interaction,
+    including background work it schedules, and `ctx.data` can be used to
+    keep per-interaction state such as a parent span.
+    """
+
+    def start(self, ctx: "TraceContext", phase: str, attrs: dict):
+        pass
+
+    def end(
+        self,
+        ctx: "TraceContext",
+        phase: str,
+        duration: float,
+        attrs: dict,
+        error: Optional[BaseException] = None,
+    ):
+        pass
+
+
+class _Span:
+    __slots__ = ("ctx", "phase", "attrs", "start")
+
+    def __init__(self, ctx: "TraceContext", phase: str, attrs: dict):
+        self.ctx = ctx
+        self.phase = phase
+        self.attrs = attrs
+
+    def __enter__(self):
+        if self.ctx.tracer is not None:
+            self.ctx.tracer.start(self.ctx, self.phase, self.attrs)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        timings = self.ctx.timings
+        timings[self.phase] = timings.get(self.phase, 0.0) + duration
+        if self.ctx.tracer is not None:
+            self.ctx.tracer.end(self.ctx, self.phase, duration, self.attrs, exc)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class TraceContext:
+    """
+    The trace of a single interaction. `timings` holds the total seconds
+    spent in each phase so far.
+    """
+
+    __slots__ = ("tracer", "interaction_id", "timings", "data", "_token")
+
+    def __init__(self, tracer: Optional[Tracer] = None):
+        self.tracer = tracer
+        self.interaction_id = None
+        self.timings: Dict[str, float] = {}
+        self.data = {}
+        self._token = None
+
+    def activate(self):
+        """
+        Make this the current trace, for code running in this task and in any
+        task it creates.
+        """
+        self._token = _current_trace.set(self)
+
+    def deactivate(self):
+        if self._token is not None:
+            _current_trace.reset(self._token)
+            self._token = None
+
+    def span(self, phase: str, **attrs) -> _Span:
+        return _Span(self, phase, attrs)
+
+    def server_timing(self) -> str:
+        """
+        Format the timings as a Server-Timing header value, in milliseconds.
+        """
+        return ", ".join(
+            f"{phase};dur={duration * 1000:.2f}"
+            for phase, duration in self.timings.items()
+        )
+
+
+def current_trace() -> Optional[TraceContext]:
+    return _current_trace.get()
+
+
+def span(ctx: Optional[TraceContext], phase: str, **attrs):
+    """
+    Time a phase of the trace `ctx`. Returns a shared no-op context manager
+    when tracing is disabled.
+    """
+    if ctx is None:
+        return _NULL_SPAN
+    return _Span(ctx, phase, attrs)
+
+
+async def traced(coro, phase: str):
+    """
+    Await `coro` as a phase of the current trace.
+    """
+    with span(current_trace(), phase):
+        return await coro